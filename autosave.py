@@ -0,0 +1,90 @@
+# Guardado automático del estado de trabajo de la UI (D, Q, R, F, personas, tareas, franjas y parámetros).
+# Cada edición solo marca el estado como pendiente; pasados `delay` segundos sin más cambios, un hilo en
+# segundo plano toma la instantánea, la serializa y la escribe de forma atómica (archivo temporal en la
+# misma carpeta + os.replace), así que los manejadores de Flet nunca esperan al disco y un cierre a mitad
+# de escritura deja intacto el staffing_data.json anterior.
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def write_json_atomic(path, obj, **dump_kwargs):
+    # Escribe obj como JSON en un temporal junto a path y lo sustituye de una vez con os.replace.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class AutoSaver:
+    """
+    Guardado diferido (debounce) en un hilo propio:
+    - touch(): la UI avisa de un cambio (barato: solo mueve el plazo, sin copiar nada).
+    - Al vencer el plazo, snapshot() construye los datos y write(data) los guarda.
+    - save(data): guardado inmediato desde otro hilo (p. ej. al optimizar), serializado con el automático.
+    - close(): guarda lo pendiente y termina el hilo.
+    Si snapshot() falla con RuntimeError (un diccionario cambió de tamaño mientras se copiaba porque
+    la UI seguía editando), se vuelve a programar en lugar de guardar un estado a medias.
+    """
+    def __init__(self, snapshot, write, delay=0.3):
+        self.snapshot = snapshot
+        self.write = write
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._due = None # Instante (time.monotonic) del próximo guardado, o None si no hay cambios
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        return self._due is not None
+
+    def touch(self):
+        with self._cond:
+            self._due = time.monotonic() + self.delay
+            self._cond.notify()
+
+    def save(self, data):
+        with self._write_lock:
+            try:
+                self.write(data)
+            except OSError as e:
+                print(f"Autoguardado: no se pudo escribir el estado ({e})")
+
+    def close(self, timeout=5.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # Espera a que venza el plazo; al cerrar, lo pendiente se guarda sin esperar
+                while self._due is None or (not self._closed and time.monotonic() < self._due):
+                    if self._closed:
+                        return
+                    self._cond.wait(None if self._due is None else max(0.0, self._due - time.monotonic()))
+                self._due = None
+            try:
+                data = self.snapshot()
+            except RuntimeError as e:
+                print(f"Autoguardado: el estado cambió durante la copia, se reintenta ({e})")
+                self.touch()
+                continue
+            except Exception as e:
+                print(f"Autoguardado: no se pudo tomar la instantánea del estado ({e})")
+                continue
+            self.save(data)
@@ -0,0 +1,101 @@
+# Calendario de franjas horarias: varios días, cada uno con un turno (que puede cruzar la medianoche)
+# dividido en franjas de 15, 30 o 60 minutos. Sustituye a la lista fija de 17 horas (16h-08h).
+# El solver solo ve posiciones 0..n-1 (índices de franja) y, por cada franja, el día/turno al que
+# pertenece: entre turnos distintos no hay continuidad (ni monotonía ni inicios de bloque).
+import datetime
+import numpy as np
+
+GRANULARITIES = (15, 30, 60)
+# Calendario por defecto: el turno único de 16:00 a 09:00 en franjas de una hora (las 17 horas de siempre)
+DEFAULT_CALENDAR = {'start_date': None, 'days': 1, 'start': "16:00", 'end': "09:00", 'granularity': 60}
+
+
+def _parse_time(text):
+    hours, minutes = str(text).split(':')
+    return datetime.time(int(hours), int(minutes))
+
+
+class Calendar:
+    """
+    Franjas de `granularity` minutos de `days` turnos consecutivos. Cada turno empieza a la hora
+    `start` de su día y termina a la hora `end` (al día siguiente si end <= start).
+    - slots: lista de datetime con el inicio de cada franja.
+    - day_of: int array [franjas], índice del turno (0..days-1) de cada franja.
+    Sin start_date las etiquetas solo muestran la hora (caso de un único turno sin fecha).
+    """
+    def __init__(self, start_date=None, days=1, start="16:00", end="09:00", granularity=60):
+        if int(granularity) not in GRANULARITIES:
+            raise ValueError(f"Granularity must be one of {GRANULARITIES} minutes")
+        self.start_date = start_date
+        self.days = max(1, int(days))
+        self.start = start
+        self.end = end
+        self.granularity = int(granularity)
+
+        first_day = datetime.date.fromisoformat(start_date) if start_date else datetime.date(2000, 1, 1)
+        t_start, t_end = _parse_time(start), _parse_time(end)
+        step = datetime.timedelta(minutes=self.granularity)
+        self.slots = []
+        day_of = []
+        for d in range(self.days):
+            begin = datetime.datetime.combine(first_day + datetime.timedelta(days=d), t_start)
+            finish = datetime.datetime.combine(first_day + datetime.timedelta(days=d), t_end)
+            if finish <= begin:
+                finish += datetime.timedelta(days=1)
+            t = begin
+            while t < finish:
+                self.slots.append(t)
+                day_of.append(d)
+                t += step
+        self.day_of = np.array(day_of, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def label(self, i):
+        # Etiqueta de columna: '16h' (franjas de una hora) o '16:30'; con varios días, precedida del día.
+        t = self.slots[i]
+        text = f"{t.hour:02d}h" if self.granularity == 60 else f"{t:%H:%M}"
+        if self.days > 1:
+            text = f"{t:%a} {text}"
+        return text
+
+    def short_label(self, i):
+        # Etiqueta corta para los botones de franja (sin el día).
+        t = self.slots[i]
+        return f"{t.hour:02d}h" if self.granularity == 60 else f"{t:%H:%M}"
+
+    def day_label(self, d):
+        # Cabecera de un turno: 'Mon 2026-10-19' o 'Day 1' si no hay fecha.
+        if not self.start_date:
+            return f"Day {d + 1}"
+        day = datetime.date.fromisoformat(self.start_date) + datetime.timedelta(days=d)
+        return f"{day:%a %Y-%m-%d}"
+
+    def segments(self, slot_indices):
+        # Turno de cada franja activa (en el orden de slot_indices), para data['segments'] del solver.
+        return self.day_of[np.asarray(slot_indices, dtype=np.int64)].tolist() if len(slot_indices) else []
+
+    def to_json(self):
+        return {
+            'start_date': self.start_date, 'days': self.days, 'start': self.start,
+            'end': self.end, 'granularity': self.granularity,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        # Calendario guardado en el JSON (clave 'calendar'); los JSON antiguos usan el calendario por defecto.
+        settings = dict(DEFAULT_CALENDAR)
+        settings.update((data or {}).get('calendar') or {})
+        return cls(**settings)
+
+
+def contiguous_next(segments, num_hours):
+    """
+    bool [num_hours - 1]: True si la posición h y la h+1 son del mismo turno (hay continuidad).
+    Sin segmentos (datos antiguos) todo el horizonte es un único turno.
+    """
+    if not segments:
+        return np.ones(max(0, num_hours - 1), dtype=bool)
+    seg = np.asarray(segments)
+    return seg[1:] == seg[:-1]
@@ -0,0 +1,219 @@
+# Formulación agregada por perfiles ("cuadrillas") para eventos grandes con mucho personal intercambiable.
+# Las personas con los mismos D, Q y F forman un perfil k; en lugar de una X binaria por persona,
+# el modelo decide N[k,t,h] = cuántas personas del perfil k hacen la tarea t en la hora h (entero 0..n_k).
+# Con cientos de azafatos en unos pocos perfiles, el MIP es una o dos órdenes de magnitud más pequeño.
+# Después, disaggregate() reparte los recuentos entre las personas de cada perfil hora a hora,
+# equilibrando la carga dentro del perfil, manteniendo a quien ya trabajaba (menos inicios de bloque)
+# y cambiando de tarea (menos monotonía); la búsqueda local de heuristic.py pule el resultado.
+import numpy as np
+import model_builder
+import heuristic
+from model_builder import StaffingModel, INF
+from calendar_slots import contiguous_next
+
+
+class CrewModel(StaffingModel):
+    """
+    StaffingModel agregado. Además de los bloques de columnas guarda:
+    - groups: lista de arrays con las personas de cada perfil; sizes: n_k.
+    - n_index: (k, t, h) de cada columna N.
+    extract_assignment devuelve los recuentos int [perfiles, tareas, horas] (no un plan por persona).
+    """
+    def extract_assignment(self, col_value):
+        start, size = self.blocks['N']
+        counts = np.zeros((len(self.groups), self.num_tasks, self.num_hours), dtype=np.int32)
+        counts[self.n_index] = np.rint(col_value[start:start + size])
+        return counts
+
+
+def build_crew_model(data):
+    """
+    Construye el modelo agregado por perfiles (misma función objetivo que build_model):
+    - Demanda: sum_k N[k,t,h] == R[t,h]; capacidad: sum_t N[k,t,h] <= n_k.
+    - Carga: con enteros W_max >= ceil(carga_k / n_k) y W_min <= floor(carga_k / n_k), que es lo que
+      consigue un reparto equilibrado dentro del perfil.
+    - Monotonía: YA[k,t,h] >= N[k,t,h] + N[k,t,h+1] - n_k (repeticiones inevitables del perfil).
+    - Inicios de bloque: SA[k,h] >= (personas del perfil trabajando en h) - (en h-1).
+    - Obligatoriedades: UA[k,t,h] + N[k,t,h] >= n_k donde el perfil tiene F=1; con
+      data['mandatory_mode'] == 'hard', sin UA y con N[k,t,h] >= n_k como cota.
+    Devuelve un CrewModel finalizado.
+    """
+    D_arr, Q_arr, R_arr, F_arr = model_builder.data_to_arrays(data)
+    P, T, H = F_arr.shape
+    groups = model_builder.profile_groups(D_arr, Q_arr, F_arr)
+    K = len(groups)
+    rep = np.array([g[0] for g in groups], dtype=np.int64) # Persona representante de cada perfil
+    sizes = np.array([g.size for g in groups], dtype=np.int64)
+
+    alpha = float(data['alpha'])
+    beta = float(data['beta'])
+    gamma = float(data['gamma'])
+    epsilon = float(data['epsilon'])
+
+    m = CrewModel(P, T, H)
+    m.D, m.Q, m.R, m.F = D_arr, Q_arr, R_arr, F_arr
+    m.groups = groups
+    m.sizes = sizes
+
+    feasible = (Q_arr[rep][:, :, None] == 1) & (D_arr[rep][:, None, :] == 1) & (R_arr[None, :, :] > 0) # (K, T, H)
+    n_k, n_t, n_h = np.nonzero(feasible)
+    works_possible = feasible.any(axis=1) # (K, H)
+    linked = contiguous_next(data.get('segments'), H)
+
+    # 1. VARIABLES
+    hard = data.get('mandatory_mode', 'soft') == 'hard'
+    m.hard_mandatory = hard
+    N_lower = np.where(F_arr[rep[n_k], n_t, n_h] == 1, sizes[n_k], 0) if hard else 0
+    N = m.add_cols('N', (n_k.size,), 0.0, N_lower, sizes[n_k], integer=True)
+    n_col = np.full((K, T, H), -1, dtype=np.int32)
+    n_col[n_k, n_t, n_h] = N
+    m.n_index = (n_k, n_t, n_h)
+
+    W_max = m.add_cols('W_max', (1,), alpha, 0, INF, integer=True)[0]
+    W_min = m.add_cols('W_min', (1,), -alpha, 0, INF, integer=True)[0]
+
+    y_k, y_t, y_h = np.nonzero(feasible[:, :, :-1] & feasible[:, :, 1:] & linked[None, None, :])
+    YA = m.add_cols('YA', (y_k.size,), beta, 0, sizes[y_k], integer=True)
+
+    s_k, s_h = np.nonzero(works_possible[:, 1:] & linked[None, :])
+    s_h = s_h + 1
+    SA = m.add_cols('SA', (s_k.size,), gamma, 0, sizes[s_k], integer=True)
+
+    f_k, f_t, f_h = (np.empty(0, dtype=np.int64),) * 3 if hard else np.nonzero(F_arr[rep] == 1)
+    f_n = n_col[f_k, f_t, f_h]
+    U_lower = np.where(f_n >= 0, 0, sizes[f_k]) # Sin columna N la obligatoriedad se incumple entera
+    UA = m.add_cols('UA', (f_k.size,), epsilon, U_lower, sizes[f_k], integer=True)
+
+    # 2. RESTRICCIONES
+
+    # Capacidad del perfil: sum_t N[k,t,h] <= n_k (solo donde hay al menos dos tareas posibles)
+    multi_k, multi_h = np.nonzero(feasible.sum(axis=1) >= 2)
+    rows = m.add_rows((multi_k.size,), -INF, sizes[multi_k])
+    row_of = np.full((K, H), -1, dtype=np.int32)
+    row_of[multi_k, multi_h] = rows
+    sel = row_of[n_k, n_h] >= 0
+    m.add_entries(row_of[n_k, n_h][sel], N[sel], 1.0)
+
+    # Demanda: sum_k N[k,t,h] == R[t,h]
+    r_t, r_h = np.nonzero(R_arr > 0)
+    rows = m.add_rows((r_t.size,), R_arr[r_t, r_h], R_arr[r_t, r_h])
+    row_of = np.full((T, H), -1, dtype=np.int32)
+    row_of[r_t, r_h] = rows
+    m.add_entries(row_of[n_t, n_h], N, 1.0)
+
+    # Carga: n_k * W_max - sum N[k,·,·] >= 0 y n_k * W_min - sum N[k,·,·] <= 0
+    rows = m.add_rows((K,), 0, INF)
+    m.add_entries(rows, W_max, sizes.astype(np.float64))
+    m.add_entries(rows[n_k], N, -1.0)
+    rows = m.add_rows((K,), -INF, 0)
+    m.add_entries(rows, W_min, sizes.astype(np.float64))
+    m.add_entries(rows[n_k], N, -1.0)
+    # W_min <= W_max (acota W_min también si no hay ningún perfil)
+    rows = m.add_rows((1,), 0, INF)
+    m.add_entries(rows, W_max, 1.0)
+    m.add_entries(rows, W_min, -1.0)
+
+    # Monotonía: YA - N[h] - N[h+1] >= -n_k
+    rows = m.add_rows((y_k.size,), -sizes[y_k], INF)
+    m.add_entries(rows, YA, 1.0)
+    m.add_entries(rows, n_col[y_k, y_t, y_h], -1.0)
+    m.add_entries(rows, n_col[y_k, y_t, y_h + 1], -1.0)
+
+    # Inicios de bloque: SA[k,h] - sum_t N[k,t,h] + sum_t N[k,t,h-1] >= 0
+    rows = m.add_rows((s_k.size,), 0, INF)
+    m.add_entries(rows, SA, 1.0)
+    row_of = np.full((K, H + 1), -1, dtype=np.int32)
+    row_of[s_k, s_h] = rows
+    sel = row_of[n_k, n_h] >= 0
+    m.add_entries(row_of[n_k, n_h][sel], N[sel], -1.0)
+    sel = row_of[n_k, n_h + 1] >= 0
+    m.add_entries(row_of[n_k, n_h + 1][sel], N[sel], 1.0)
+
+    # Obligatoriedades: UA + N >= n_k (solo con columna N)
+    sel = f_n >= 0
+    rows = m.add_rows((int(sel.sum()),), sizes[f_k][sel], INF)
+    m.add_entries(rows, UA[sel], 1.0)
+    m.add_entries(rows, f_n[sel], 1.0)
+
+    return m.finalize()
+
+
+def disaggregate(counts, groups, num_people, segments=None):
+    """
+    Reparte los recuentos N[k,t,h] entre las personas de cada perfil, hora a hora:
+    1. Quién trabaja: los de menos carga del perfil (así la carga dentro del perfil difiere como mucho
+       en una hora, que es lo que supone el modelo agregado); a igual carga, quien ya trabajaba en la
+       hora anterior del mismo turno (evita inicios de bloque).
+    2. Qué tarea: primero las tareas con más riesgo de repetición; cada plaza va a alguien que no la hizo
+       en la hora anterior, preferentemente a quien más riesgo tiene de repetir la suya, y luego por carga.
+    Devuelve el plan int8 [personas, tareas, horas].
+    """
+    K, T, H = counts.shape
+    assignment = np.zeros((num_people, T, H), dtype=np.int8)
+    linked = contiguous_next(segments, H)
+    load = np.zeros(num_people, dtype=np.int64)
+    prev_task = np.full(num_people, -1, dtype=np.int64)
+
+    for h in range(H):
+        new_shift = h == 0 or not linked[h - 1]
+        current = np.full(num_people, -1, dtype=np.int64)
+        for k, members in enumerate(groups):
+            demand = counts[k, :, h]
+            needed = int(demand.sum())
+            if needed == 0:
+                continue
+            chosen = sorted(
+                members.tolist(), key=lambda i: (load[i], new_shift or prev_task[i] < 0, i)
+            )[:needed]
+
+            last = {i: (-1 if new_shift else int(prev_task[i])) for i in chosen}
+            remaining = demand.astype(np.int64).copy()
+            # Presión de cada tarea: plazas que no pueden cubrir quienes no la hicieron en la hora anterior
+            holders = np.bincount([t for t in last.values() if t >= 0], minlength=T)
+            order = np.argsort(-(remaining - (needed - holders)), kind='stable')
+            free = set(chosen)
+            for t in order.tolist():
+                for _ in range(int(remaining[t])):
+                    i = min(free, key=lambda i: (
+                        last[i] == t,
+                        -(remaining[last[i]] if last[i] >= 0 else 0),
+                        load[i], i
+                    ))
+                    free.discard(i)
+                    current[i] = t
+                    remaining[t] -= 1
+
+        working = np.nonzero(current >= 0)[0]
+        assignment[working, current[working], h] = 1
+        load[working] += 1
+        prev_task = current
+    return assignment
+
+
+def solve_crew(data, control=None, options=None, polish_time=1.0):
+    """
+    Resuelve el modelo agregado con HiGHS, lo desagrega en un plan por persona y lo pule con
+    la búsqueda local de la heurística durante polish_time segundos.
+    Devuelve (status_highs, assignment int8 [personas, tareas, horas] o None si no hay solución).
+    """
+    cm = build_crew_model(data)
+    print(f"Modelo agregado: {len(cm.groups)} perfiles para {cm.num_people} personas, "
+          f"{cm.num_col} columnas, {cm.num_row} filas, {cm.num_nz} no-nulos")
+    status_h, has_sol, counts = model_builder.solve_highs(cm, float(data['timelimit']), control, options=options)
+    if not has_sol:
+        return status_h, None
+
+    segments = data.get('segments')
+    plan = disaggregate(counts, cm.groups, cm.num_people, segments)
+    assigned = np.where(plan.any(axis=1), plan.argmax(axis=1), -1)
+    assigned = heuristic.local_search(
+        assigned, cm.D, cm.Q, cm.F,
+        float(data['alpha']), float(data['beta']), float(data['gamma']), float(data['epsilon']),
+        polish_time, segments
+    )
+    polished = np.zeros_like(plan)
+    p_idx, h_idx = np.nonzero(assigned >= 0)
+    polished[p_idx, assigned[p_idx, h_idx], h_idx] = 1
+    if cm.hard_mandatory and ((cm.F == 1) & (polished == 0)).any():
+        return status_h, plan # El pulido no ve las obligatoriedades duras: se queda el plan desagregado
+    return status_h, polished
@@ -0,0 +1,84 @@
+# Formato en disco de staffing_data.json.
+# v1 (hasta ahora): D, Q, R y F como diccionarios anidados completos, F con un 0/1 por cada
+# persona x tarea x hora, e indent=2; con rosters reales son miles de líneas de ceros.
+# v2: D, Q y R como matrices de enteros por filas con sus cabeceras de índice, y F como lista
+# dispersa de [persona, tarea, hora] con F=1; se escribe sin sangría.
+# En memoria (UI, scenarios.py, caché) se sigue usando el formato de diccionarios de v1, con F
+# dispersa (solo los 1): quien lee F debe usar 0 por defecto. Los JSON v1 se leen igual y se
+# reescriben en v2 al guardar.
+SCHEMA_VERSION = 2
+
+
+def _matrix_to_disk(matrix, int_cols=False):
+    # {fila: {col: v}} -> {'rows': [...], 'cols': [...], 'values': [[...], ...]} (por filas).
+    # Las columnas son la unión de las claves de todas las filas; los huecos no se guardan (None).
+    rows = list(matrix)
+    cols = list(dict.fromkeys(c for r in rows for c in matrix[r]))
+    values = [[matrix[r].get(c) for c in cols] for r in rows]
+    return {'rows': rows, 'cols': [int(c) for c in cols] if int_cols else cols, 'values': values}
+
+
+def _matrix_from_disk(block, int_cols=False):
+    # Inversa de _matrix_to_disk; las horas vuelven a ser claves de texto como en el JSON v1.
+    cols = [str(c) for c in block['cols']] if int_cols else block['cols']
+    return {
+        r: {c: v for c, v in zip(cols, row) if v is not None}
+        for r, row in zip(block['rows'], block['values'])
+    }
+
+
+def sparse_mandatory(F):
+    # F en formato de diccionarios (denso o disperso) -> lista de [persona, tarea, hora] con F=1.
+    return [
+        [person, task, int(hour)]
+        for person, tasks in F.items() for task, hours in tasks.items()
+        for hour, value in hours.items() if value
+    ]
+
+
+def mandatory_dict(triples):
+    # Lista de [persona, tarea, hora] -> F dispersa {persona: {tarea: {'hora': 1}}}.
+    F = {}
+    for person, task, hour in triples:
+        F.setdefault(person, {}).setdefault(task, {})[str(hour)] = 1
+    return F
+
+
+def to_disk(data):
+    # Datos en memoria -> documento v2 listo para json.dump.
+    doc = dict(data, version=SCHEMA_VERSION)
+    if 'D' in data:
+        doc['D'] = _matrix_to_disk(data['D'], int_cols=True)
+    if 'Q' in data:
+        doc['Q'] = _matrix_to_disk(data['Q'])
+    if 'R' in data:
+        doc['R'] = _matrix_to_disk(data['R'], int_cols=True)
+    if 'F' in data:
+        doc['F'] = sparse_mandatory(data['F'])
+    return doc
+
+
+def from_disk(doc):
+    """
+    Documento leído de staffing_data.json (v1 o v2) -> datos en memoria.
+    Un v1 (sin clave 'version') se devuelve tal cual salvo F, que pasa a dispersa.
+    """
+    if doc is None:
+        return None
+    version = int(doc.get('version', 1))
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"staffing_data.json has schema version {version}; this build reads up to {SCHEMA_VERSION}")
+    data = {k: v for k, v in doc.items() if k != 'version'}
+    if version == 1:
+        if 'F' in data:
+            data['F'] = mandatory_dict(sparse_mandatory(data['F']))
+        return data
+    if 'D' in data:
+        data['D'] = _matrix_from_disk(data['D'], int_cols=True)
+    if 'Q' in data:
+        data['Q'] = _matrix_from_disk(data['Q'])
+    if 'R' in data:
+        data['R'] = _matrix_from_disk(data['R'], int_cols=True)
+    if 'F' in data:
+        data['F'] = mandatory_dict(data['F'])
+    return data
@@ -0,0 +1,187 @@
+# Comprobación previa de factibilidad sobre los arrays densos, antes de construir el modelo.
+# Detecta en milisegundos los casos que HiGHS/CBC solo reportarían como 'Infeasible' tras
+# construir y resolver el MIP, y devuelve las celdas exactas (tarea, hora) que lo provocan.
+from collections import deque
+import numpy as np
+
+
+class FeasibilityReport:
+    """
+    Resultado de check_feasibility.
+    - cells: bool [tareas, horas], True en las celdas de demanda R que no se pueden cubrir.
+    - required / supply: int [tareas, horas], demanda y personas disponibles y cualificadas por celda.
+    - issues: lista de (tipo, hora, tareas, demanda, oferta) que hacen el plan imposible:
+        'hour'     -> la hora pide más gente de la que está disponible.
+        'task'     -> la tarea pide más gente de la que está disponible y cualificada.
+        'matching' -> un grupo de tareas compite por las mismas personas (cota de emparejamiento).
+    - mandatory_conflicts: bool [personas, tareas, horas], F=1 imposible de cumplir (D=0, Q=0 o R=0;
+      en modo 'hard' también dos obligatoriedades de la misma persona y hora, o más que la demanda R).
+      En modo 'soft' no impide resolver, pero se penaliza siempre con epsilon; en modo 'hard' sí.
+    """
+    def __init__(self, required, supply, hard_mandatory=False):
+        self.required = required
+        self.supply = supply
+        self.hard_mandatory = hard_mandatory
+        self.cells = np.zeros(required.shape, dtype=bool)
+        self.issues = []
+        self.mandatory_conflicts = None
+
+    @property
+    def is_feasible(self):
+        if self.hard_mandatory and self.mandatory_conflicts is not None and self.mandatory_conflicts.any():
+            return False
+        return not self.issues
+
+    def add_issue(self, kind, h, task_idx, demand, supply):
+        self.issues.append((kind, int(h), [int(t) for t in task_idx], int(demand), int(supply)))
+        self.cells[task_idx, h] = True
+
+    def describe(self, people, tasks, hour_labels):
+        # Mensajes legibles (en inglés, para la UI) de cada problema encontrado.
+        lines = []
+        for kind, h, task_idx, demand, supply in self.issues:
+            names = ", ".join(tasks[t] for t in task_idx)
+            if kind == 'hour':
+                lines.append(f"{hour_labels[h]}: {demand} people required but only {supply} available.")
+            elif kind == 'task':
+                lines.append(f"{hour_labels[h]} - {names}: {demand} required but only {supply} qualified and available.")
+            else:
+                lines.append(f"{hour_labels[h]} - {names}: {demand} required in total but only {supply} people can cover them.")
+        if self.mandatory_conflicts is not None:
+            reason = ("is not available, not qualified, there is no demand or it clashes with other mandatory tasks"
+                      if self.hard_mandatory else "is not available, not qualified or there is no demand")
+            for p, t, h in zip(*np.nonzero(self.mandatory_conflicts)):
+                lines.append(f"{hour_labels[h]} - {people[p]} is mandatory on {tasks[t]} but {reason}.")
+        return lines
+
+
+def _hall_violation(R_col, qualified_free):
+    """
+    Cota de emparejamiento de una hora como flujo máximo sobre perfiles de cualificación:
+    fuente -> tarea (R_col[t]) -> perfil (si el perfil cubre la tarea) -> sumidero (personas con ese perfil).
+    qualified_free: bool [personas libres en la hora, tareas]. Las personas con el mismo perfil son
+    intercambiables, así que el grafo crece con los perfiles distintos y no con la plantilla.
+    Si el flujo no cubre todas las plazas, devuelve (tareas, demanda, oferta) de un conjunto que incumple
+    la condición de Hall: las tareas alcanzables en el grafo residual desde la fuente piden más gente
+    de la que hay entre todos sus perfiles candidatos. Si se cubren todas, devuelve None.
+    """
+    tasks = np.nonzero(R_col > 0)[0]
+    if tasks.size == 0:
+        return None
+    profiles, counts = np.unique(qualified_free[:, tasks], axis=0, return_counts=True)
+    useful = profiles.any(axis=1)
+    profiles, counts = profiles[useful], counts[useful].tolist()
+    need = R_col[tasks].astype(int).tolist()
+    task_profiles = [np.nonzero(profiles[:, j])[0].tolist() for j in range(tasks.size)]
+    profile_tasks = [np.nonzero(row)[0].tolist() for row in profiles]
+    sent = [0] * tasks.size # Plazas cubiertas por tarea
+    used = [0] * len(counts) # Personas asignadas por perfil
+    flow = {} # (tarea, perfil) -> personas
+
+    # Reparto voraz inicial: primero las tareas con menos perfiles candidatos
+    for j in sorted(range(tasks.size), key=lambda j: len(task_profiles[j])):
+        for k in task_profiles[j]:
+            take = min(need[j] - sent[j], counts[k] - used[k])
+            if take > 0:
+                flow[j, k] = flow.get((j, k), 0) + take
+                sent[j] += take
+                used[k] += take
+            if sent[j] == need[j]:
+                break
+
+    def search():
+        # BFS en el grafo residual desde las tareas con plazas sin cubrir. Devuelve (camino, tareas
+        # alcanzadas, perfiles alcanzados); el camino es None si no se llega al sumidero.
+        parent_task = {j: None for j in range(tasks.size) if sent[j] < need[j]}
+        parent_profile = {}
+        queue = deque(parent_task)
+        while queue:
+            j = queue.popleft()
+            for k in task_profiles[j]:
+                if k in parent_profile:
+                    continue
+                parent_profile[k] = j
+                if used[k] < counts[k]:
+                    path = [(j, k)]
+                    while parent_task[j] is not None:
+                        k_prev = parent_task[j]
+                        j = parent_profile[k_prev]
+                        path.append((j, k_prev))
+                    return path[::-1], parent_task, parent_profile
+                for j2 in profile_tasks[k]:
+                    if j2 not in parent_task and flow.get((j2, k), 0) > 0:
+                        parent_task[j2] = k
+                        queue.append(j2)
+        return None, parent_task, parent_profile
+
+    # Caminos aumentantes (alternan tarea -> perfil -> tarea que le cede una persona -> ...)
+    while True:
+        path, reached_tasks, reached_profiles = search()
+        if path is None:
+            break
+        j0, k_end = path[0][0], path[-1][1]
+        amount = min(need[j0] - sent[j0], counts[k_end] - used[k_end])
+        for (_, k), (j_next, _) in zip(path, path[1:]):
+            amount = min(amount, flow[j_next, k])
+        for idx, (j, k) in enumerate(path):
+            flow[j, k] = flow.get((j, k), 0) + amount
+            if idx + 1 < len(path):
+                flow[path[idx + 1][0], k] -= amount
+        sent[j0] += amount
+        used[k_end] += amount
+
+    if not reached_tasks:
+        return None
+    task_idx = sorted(int(tasks[j]) for j in reached_tasks)
+    return task_idx, int(R_col[task_idx].sum()), int(sum(counts[k] for k in reached_profiles))
+
+
+def check_feasibility(D_arr, Q_arr, R_arr, F_arr, hard_mandatory=False):
+    """
+    Comprobaciones baratas, de menor a mayor coste, sobre D [P, H], Q [P, T], R [T, H] y F [P, T, H]:
+    1. Capacidad por hora: sum_t R[t, h] <= personas disponibles en h.
+    2. Oferta por tarea y hora: R[t, h] <= personas disponibles en h y cualificadas para t.
+    3. Cota de emparejamiento por hora (condición de Hall), solo en horas que superan 1 y 2.
+       Con hard_mandatory las personas con obligatoriedad ya ocupan su plaza y salen del emparejamiento.
+    4. F=1 en celdas donde la persona no está disponible, no está cualificada o no hay demanda
+       (con hard_mandatory, también las que chocan entre sí o superan la demanda).
+    Devuelve un FeasibilityReport.
+    """
+    available = D_arr == 1
+    qualified = Q_arr == 1
+    supply = qualified.T.astype(np.int32) @ available.astype(np.int32) # (T, H)
+    report = FeasibilityReport(R_arr, supply, hard_mandatory)
+    fixed = (F_arr == 1) if hard_mandatory else np.zeros(F_arr.shape, dtype=bool)
+    fixed_busy = fixed.any(axis=1) # (P, H): la persona ya tiene su plaza fijada
+    fixed_count = fixed.sum(axis=0) # (T, H): plazas ya cubiertas por obligatoriedades
+
+    # 1. Capacidad por hora
+    demand_h = R_arr.sum(axis=0)
+    capacity_h = available.sum(axis=0)
+    for h in np.nonzero(demand_h > capacity_h)[0]:
+        report.add_issue('hour', h, np.nonzero(R_arr[:, h] > 0)[0], demand_h[h], capacity_h[h])
+
+    # 2. Oferta por tarea y hora
+    for t, h in zip(*np.nonzero(R_arr > supply)):
+        report.add_issue('task', h, [t], R_arr[t, h], supply[t, h])
+
+    # 3. Emparejamiento: varias tareas pueden depender del mismo grupo reducido de personas
+    flagged = report.cells.any(axis=0)
+    for h in range(R_arr.shape[1]):
+        if flagged[h] or demand_h[h] == 0:
+            continue
+        free = available[:, h] & ~fixed_busy[:, h]
+        violation = _hall_violation(np.maximum(R_arr[:, h] - fixed_count[:, h], 0), qualified[free])
+        if violation is not None:
+            report.add_issue('matching', h, *violation)
+
+    # 4. Obligatoriedad imposible
+    report.mandatory_conflicts = (F_arr == 1) & ~(
+        qualified[:, :, None] & available[:, None, :] & (R_arr[None, :, :] > 0)
+    )
+    if hard_mandatory:
+        # Dos tareas obligatorias a la vez, o más obligatoriedades que plazas en la celda
+        clash = fixed.sum(axis=1) > 1 # (P, H)
+        excess = fixed_count > R_arr # (T, H)
+        report.mandatory_conflicts |= fixed & (clash[:, None, :] | excess[None, :, :])
+    return report
@@ -0,0 +1,202 @@
+# Motor heurístico rápido (voraz + búsqueda local) en Python/NumPy puro.
+# Da planes en menos de un segundo para ediciones "qué pasa si", sirve de solución de respaldo
+# cuando el MIP agota el tiempo sin incumbente y de solución inicial (warm start) para HiGHS/CBC.
+import time
+import numpy as np
+from calendar_slots import contiguous_next
+
+
+def _row_cost(row, mandatory, beta, gamma, epsilon, linked):
+    # Coste de la fila de una persona (tarea por hora, -1 libre): monotonía, inicios de bloque y F incumplidas.
+    # linked[k - 1] indica si la hora k sigue a la k - 1 en el mismo turno.
+    monotony = 0
+    starts = 0
+    for k in range(1, len(row)):
+        if row[k] >= 0 and linked[k - 1]:
+            if row[k] == row[k - 1]:
+                monotony += 1
+            elif row[k - 1] < 0:
+                starts += 1
+    unmet = 0
+    for t, k in mandatory:
+        if row[k] != t:
+            unmet += 1
+    return beta * monotony + gamma * starts + epsilon * unmet
+
+
+def greedy_assignment(D_arr, Q_arr, R_arr, F_arr):
+    """
+    Relleno voraz de la demanda R[t][h], hora a hora, con personas cualificadas y disponibles.
+    Prioridad de cada candidato: obligatoriedad F, menor carga acumulada, continuidad con la hora
+    anterior (evita descansos) y cambio de tarea (evita monotonía). Si una plaza se queda sin
+    candidato libre, se busca un camino de aumento (reasignando a otra persona de la misma hora).
+    Devuelve (assigned [personas, horas] con índice de tarea o -1, complete).
+    """
+    P, T, H = F_arr.shape
+    assigned = np.full((P, H), -1, dtype=np.int64)
+    load = np.zeros(P, dtype=np.int64)
+    complete = True
+
+    for h in range(H):
+        available = D_arr[:, h] == 1
+        candidates = [np.nonzero(available & (Q_arr[:, t] == 1))[0].tolist() for t in range(T)]
+
+        # Plazas de la hora: las tareas más escasas en candidatos se cubren primero
+        slots = []
+        for t in sorted(range(T), key=lambda t: len(candidates[t])):
+            slots.extend([t] * int(R_arr[t, h]))
+        slot_of = {} # persona -> plaza que ocupa en esta hora
+        slot_person = [-1] * len(slots)
+
+        def augment(s):
+            # Camino de aumento (Kuhn, en profundidad con pila explícita): busca persona para la plaza s
+            # moviendo a quien haga falta. Devuelve False si no hay camino.
+            visited = set()
+            stack = [(s, iter(candidates[slots[s]]))]
+            chosen = [] # persona probada en cada nivel de la pila
+            while stack:
+                s_cur, it = stack[-1]
+                for i in it:
+                    if i in visited:
+                        continue
+                    visited.add(i)
+                    if i in slot_of:
+                        chosen.append(i)
+                        stack.append((slot_of[i], iter(candidates[slots[slot_of[i]]])))
+                        break
+                    # Persona libre: cada nivel se queda con la persona que probó
+                    chosen.append(i)
+                    for (s_k, _), i_k in zip(stack, chosen):
+                        slot_of[i_k] = s_k
+                        slot_person[s_k] = i_k
+                    return True
+                else:
+                    stack.pop()
+                    if chosen:
+                        chosen.pop()
+            return False
+
+        # Candidatos de cada tarea ordenados una vez por prioridad (la carga solo cambia al cerrar la hora),
+        # con un puntero que avanza sobre los que ya tienen plaza: el relleno es O(P log P) por tarea y hora
+        prev = assigned[:, h - 1] if h > 0 else np.full(P, -1)
+        pool = {}
+        for s, t in enumerate(slots):
+            if t not in pool:
+                cand = np.asarray(candidates[t], dtype=np.int64)
+                order = np.lexsort((prev[cand] == t, prev[cand] < 0, load[cand], F_arr[cand, t, h] != 1))
+                pool[t] = [cand[order].tolist(), 0]
+            ranked, pos = pool[t]
+            while pos < len(ranked) and ranked[pos] in slot_of:
+                pos += 1
+            pool[t][1] = pos
+            if pos < len(ranked):
+                best = ranked[pos]
+                slot_of[best] = s
+                slot_person[s] = best
+            elif not augment(s):
+                complete = False
+
+        for s, i in enumerate(slot_person):
+            if i >= 0:
+                assigned[i, h] = slots[s]
+                load[i] += 1
+
+    return assigned, complete
+
+
+def local_search(assigned, D_arr, Q_arr, F_arr, alpha, beta, gamma, epsilon, time_limit=1.0, segments=None):
+    """
+    Búsqueda local de primera mejora sobre la función objetivo alpha/beta/gamma/epsilon.
+    Movimientos (nunca rompen D, Q ni R):
+    - Reemplazo: la plaza (t, h) de la persona i pasa a una persona j libre en h.
+    - Intercambio: dos personas que trabajan en h se cambian las tareas.
+    Modifica y devuelve assigned.
+    """
+    P, H = assigned.shape
+    deadline = time.monotonic() + time_limit
+    rows = [list(map(int, assigned[i])) for i in range(P)]
+    linked = contiguous_next(segments, H).tolist()
+    mandatory = [[] for _ in range(P)]
+    for i, t, k in zip(*np.nonzero(F_arr == 1)):
+        mandatory[i].append((int(t), int(k)))
+    row_cost = [_row_cost(rows[i], mandatory[i], beta, gamma, epsilon, linked) for i in range(P)]
+    load = np.array([sum(1 for v in r if v >= 0) for r in rows], dtype=np.int64)
+    qualified = Q_arr == 1
+    available = D_arr == 1
+
+    def gap_after(i_minus, j_plus):
+        load[i_minus] -= 1
+        load[j_plus] += 1
+        gap = int(load.max() - load.min())
+        load[i_minus] += 1
+        load[j_plus] -= 1
+        return gap
+
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        gap = int(load.max() - load.min()) if P else 0
+        for h in range(H):
+            if time.monotonic() >= deadline:
+                break
+            working = [i for i in range(P) if rows[i][h] >= 0]
+            free = [j for j in range(P) if rows[j][h] < 0 and available[j, h]]
+
+            # Reemplazo i -> j en la plaza (t, h)
+            for i in working:
+                t = rows[i][h]
+                for j in free:
+                    if not qualified[j, t] or rows[i][h] != t:
+                        continue
+                    rows[i][h], rows[j][h] = -1, t
+                    new_i = _row_cost(rows[i], mandatory[i], beta, gamma, epsilon, linked)
+                    new_j = _row_cost(rows[j], mandatory[j], beta, gamma, epsilon, linked)
+                    new_gap = gap_after(i, j)
+                    delta = alpha * (new_gap - gap) + new_i - row_cost[i] + new_j - row_cost[j]
+                    if delta < -1e-9:
+                        row_cost[i], row_cost[j] = new_i, new_j
+                        load[i] -= 1
+                        load[j] += 1
+                        gap = new_gap
+                        free.remove(j)
+                        free.append(i)
+                        improved = True
+                        break
+                    rows[i][h], rows[j][h] = t, -1
+
+            # Intercambio de tareas entre dos personas que trabajan en h
+            working = [i for i in range(P) if rows[i][h] >= 0]
+            for a in range(len(working)):
+                i = working[a]
+                for b in range(a + 1, len(working)):
+                    j = working[b]
+                    ti, tj = rows[i][h], rows[j][h]
+                    if ti == tj or not (qualified[i, tj] and qualified[j, ti]):
+                        continue
+                    rows[i][h], rows[j][h] = tj, ti
+                    new_i = _row_cost(rows[i], mandatory[i], beta, gamma, epsilon, linked)
+                    new_j = _row_cost(rows[j], mandatory[j], beta, gamma, epsilon, linked)
+                    if new_i + new_j < row_cost[i] + row_cost[j] - 1e-9:
+                        row_cost[i], row_cost[j] = new_i, new_j
+                        improved = True
+                    else:
+                        rows[i][h], rows[j][h] = ti, tj
+
+    return np.array(rows, dtype=np.int64).reshape(P, H)
+
+
+def solve_heuristic(D_arr, Q_arr, R_arr, F_arr, alpha, beta, gamma, epsilon, time_limit=1.0, segments=None):
+    """
+    Voraz + búsqueda local. Devuelve (assignment int8 [personas, tareas, horas], complete),
+    donde complete indica si se cubre toda la demanda R (plan factible).
+    segments: turno de cada hora; entre turnos distintos no se cuenta monotonía ni inicio de bloque.
+    """
+    P, T, H = F_arr.shape
+    assigned, complete = greedy_assignment(D_arr, Q_arr, R_arr, F_arr)
+    if complete:
+        assigned = local_search(assigned, D_arr, Q_arr, F_arr, alpha, beta, gamma, epsilon, time_limit, segments)
+
+    assignment = np.zeros((P, T, H), dtype=np.int8)
+    p_idx, h_idx = np.nonzero(assigned >= 0)
+    assignment[p_idx, assigned[p_idx, h_idx], h_idx] = 1
+    return assignment, complete
@@ -2,215 +2,297 @@ import flet as ft # Librería para el UI
 from pulp import * # Librería para programación lineal, motor CBC por defecto
 import json # Librería de python para leer .json
 import os
+import math
 import threading  # Para ejecutar el cálculo en segundo plano sin congelar la UI
+import multiprocessing
+import time
+import sqlite3
 import openpyxl   # Para generar el reporte en Excel
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 import platform   # Para detectar el sistema operativo (abrir el excel automáticamente)
 import subprocess
-import highspy # Librería que permite ejecutar el algoritmo HiGHS una vez generado el archivo .mps con PuLP
+import highspy # Librería que permite ejecutar el algoritmo HiGHS (motor nativo, sin pasar por PuLP)
+import numpy as np
+import model_builder # Construcción del modelo en arrays NumPy para HiGHS (sin PuLP ni .mps)
+from solution import StaffingSolution # Solución compacta (arrays) que consumen la UI y el Excel
+from solve_control import SolveControl, CancellableCBC, ProgressChannel # Botón Stop y progreso en vivo del solver
+import warm_start # Arranque en caliente desde el último plan guardado junto al JSON
+import heuristic # Motor heurístico rápido (voraz + búsqueda local)
+import feasibility # Comprobación previa de factibilidad (antes de construir el modelo)
+from model_session import ModelSession # Modelo HiGHS persistente entre optimizaciones (cambios incrementales)
+import solution_cache # Caché en disco de soluciones por hash de las entradas
+import solver_race # Modo carrera: CBC y HiGHS en procesos paralelos
+import solver_profiles # Perfiles de solver (fast / balanced / prove optimal)
+import rolling_horizon # Horizonte rodante por ventanas para planes de varios días
+from calendar_slots import Calendar, GRANULARITIES # Calendario de franjas (varios días, 15/30/60 min)
+import crew_model # Formulación agregada por perfiles de personal intercambiable
+import data_schema # Formato en disco de staffing_data.json (v2 disperso, lee también v1)
+import autosave # Guardado automático diferido y atómico del estado de la UI
+import plan_store # Historial de ejecuciones (entradas, planes y KPIs) en SQLite
 
 # Archivo donde se guardará la persistencia de datos (JSON)
 DATA_FILE = "staffing_data.json"
+# Segundos sin cambios en la UI antes de guardar automáticamente el estado en DATA_FILE
+AUTOSAVE_DELAY = 0.3
+# Carpeta de la caché de soluciones y número máximo de planes guardados
+CACHE_DIR = "staffing_cache"
+CACHE_MAX_ENTRIES = 50
+# Base de datos SQLite con el historial de ejecuciones (ver plan_store.py)
+HISTORY_DB = plan_store.DEFAULT_DB
 
 # =============================================================================
 # FUNCIONES DE DATOS Y MODELO MATEMÁTICO
 # =============================================================================
 
-def load_data():
-    # Carga los datos desde el archivo JSON si existe. Retorna None si no.
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+def load_data(path=DATA_FILE):
+    # Carga los datos desde el archivo JSON si existe (v1 o v2, ver data_schema.py). Retorna None si no.
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return data_schema.from_disk(json.load(f))
     return None
 
-def save_data(data):
-    # Guarda el diccionario de datos actual en el archivo JSON.
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def solve_model(data):
+def save_data(data, path=DATA_FILE):
+    # Guarda el diccionario de datos actual en el archivo JSON, siempre en el formato v2 compacto.
+    # La escritura es atómica: un cierre a mitad no deja el archivo corrupto.
+    autosave.write_json_atomic(path, data_schema.to_disk(data), ensure_ascii=False, separators=(',', ':'))
+
+def solve_model(data, control=None, start_plan=None, session=None):
+    # Punto de entrada del cálculo: elige el motor ('cbc', 'highs', 'heuristic', 'race', 'rolling' o 'crew') y devuelve un StaffingSolution.
+    # start_plan: plan previo [personas, tareas, horas] (int8) para arrancar en caliente, o None
+    # session: ModelSession de la UI; HiGHS reutiliza el modelo en memoria aplicando solo los cambios
+    # data['segments'] (opcional): turno de cada franja; sin continuidad entre turnos distintos
+    # data['mandatory_mode'] (opcional): 'soft' (F penalizada con epsilon, por defecto) o 'hard' (F obligatoria)
+    solver_type = data.get('solver', 'highs')
+
+    # Comprobación previa: si la demanda R (o una F obligatoria) es imposible de cubrir no se construye ningún modelo
+    report = feasibility.check_feasibility(*model_builder.data_to_arrays(data), hard_mandatory=is_hard_mandatory(data))
+    if not report.is_feasible:
+        print(f"Comprobación previa: {len(report.issues)} problema(s) de factibilidad, no se resuelve el modelo")
+        return StaffingSolution(LpStatus[LpStatusInfeasible], data['people'], data['tasks'], data['hours'], feasibility=report)
+
+    solution = _solve_with_engine(data, solver_type, control, start_plan, session)
+    solution.feasibility = report
+    solution.segments = data.get('segments')
+    return solution
+
+def _solve_with_engine(data, solver_type, control=None, start_plan=None, session=None):
+    # Lanza el motor elegido sobre una instancia que ya pasó la comprobación previa.
+
+    # --- OPCIÓN C: HEURÍSTICA (voraz + búsqueda local, instantánea) ---
+    if solver_type == 'heuristic':
+        return solve_model_heuristic(data)
+
+    # La heurística también da, casi gratis, una solución inicial para el MIP si no hay plan anterior
+    # (el modelo de cuadrillas no admite arranque en caliente: solo se calcula si hace falta el respaldo)
+    heuristic_plan = None
+    if start_plan is None and solver_type != 'crew':
+        heuristic_plan = run_heuristic(data)
+        start_plan = heuristic_plan
+
+    # --- OPCIÓN D: CARRERA (CBC y HiGHS en paralelo, gana el primer óptimo demostrado) ---
+    if solver_type == 'race':
+        solution = solve_model_race(data, control, start_plan)
+    # --- OPCIÓN E: HORIZONTE RODANTE (ventanas solapadas resueltas con HiGHS) ---
+    elif solver_type == 'rolling':
+        solution = solve_model_rolling(data, control, start_plan)
+    # --- OPCIÓN F: CUADRILLAS (recuentos por perfil con HiGHS + reparto por persona) ---
+    elif solver_type == 'crew':
+        solution = solve_model_crew(data, control)
+    # --- OPCIÓN B: HIGHS (modelo en memoria -> HIGHSPY, sin PuLP) ---
+    elif solver_type != 'cbc':
+        solution = solve_model_highs(data, control, start_plan, session)
+    # --- OPCIÓN A: CBC (PuLP) ---
+    else:
+        solution = solve_model_cbc(data, control, start_plan)
+
+    # El MIP terminó (límite de tiempo o Stop) sin ningún incumbente: respuesta garantizada con la heurística
+    if solution.status == LpStatus[LpStatusNotSolved]:
+        if heuristic_plan is None:
+            heuristic_plan = run_heuristic(data)
+        if heuristic_plan is not None:
+            print("El MIP no encontró solución: se devuelve el plan heurístico")
+            return StaffingSolution("Feasible", data['people'], data['tasks'], data['hours'], heuristic_plan, stopped=solution.stopped)
+    return solution
+
+def is_hard_mandatory(data):
+    # True si las obligatoriedades F son restricciones duras (data['mandatory_mode'] == 'hard').
+    return data.get('mandatory_mode', 'soft') == 'hard'
+
+def run_heuristic(data, time_limit=1.0):
+    # Ejecuta la heurística y devuelve el plan int8 [personas, tareas, horas] si cubre toda la demanda
+    # (y, con obligatoriedades duras, todas las F=1), o None.
+    D_arr, Q_arr, R_arr, F_arr = model_builder.data_to_arrays(data)
+    hard = is_hard_mandatory(data)
+    # Con obligatoriedades duras la búsqueda local no debe cambiar F por carga o monotonía: epsilon dominante
+    epsilon = max(float(data['epsilon']), 1e6) if hard else float(data['epsilon'])
+    assignment, complete = heuristic.solve_heuristic(
+        D_arr, Q_arr, R_arr, F_arr,
+        float(data['alpha']), float(data['beta']), float(data['gamma']), epsilon,
+        time_limit=time_limit, segments=data.get('segments')
+    )
+    if complete and hard:
+        complete = not ((F_arr == 1) & (assignment == 0)).any()
+    return assignment if complete else None
+
+def solve_model_heuristic(data):
+    # Motor heurístico: plan en menos de un segundo, factible pero sin garantía de óptimo.
+    print("--- EJECUTANDO HEURÍSTICA (voraz + búsqueda local) ---")
+    plan = run_heuristic(data, time_limit=min(1.0, float(data['timelimit'])))
+    status = "Feasible" if plan is not None else LpStatus[LpStatusInfeasible]
+    return StaffingSolution(status, data['people'], data['tasks'], data['hours'], plan)
+
+def solve_model_rolling(data, control=None, start_plan=None):
+    # Horizonte rodante (ver rolling_horizon.py): ventanas de data['rolling_window'] horas solapadas a la mitad.
+    window = int(data.get('rolling_window') or 8)
+    overlap = int(data.get('rolling_overlap', window // 2))
+    print(f"--- INICIANDO HORIZONTE RODANTE (ventana {window}h, solape {overlap}h) ---")
+    settings = solver_profiles.resolve_profile(data)
+    options = solver_profiles.highs_options(settings)
+    assignment, stopped = rolling_horizon.solve_rolling(
+        data, window, overlap, control, start_plan, options, bool(settings.get('continuous_aux'))
+    )
+    status = "Feasible" if assignment is not None else LpStatus[LpStatusNotSolved]
+    return StaffingSolution(status, data['people'], data['tasks'], data['hours'], assignment, stopped=stopped)
+
+def solve_model_crew(data, control=None):
+    # Modelo agregado por perfiles (ver crew_model.py): el plan por persona sale del reparto posterior,
+    # así que es factible pero no se garantiza el óptimo del modelo por persona.
+    print("--- INICIANDO MODELO AGREGADO POR PERFILES (Solver: HIGHS) ---")
+    options = solver_profiles.highs_options(solver_profiles.resolve_profile(data))
+    status_h, assignment = crew_model.solve_crew(data, control, options)
+    print(f"Highs Code: {status_h}")
+    if assignment is not None:
+        status = "Feasible"
+    elif status_h == highspy.HighsModelStatus.kInfeasible:
+        status = LpStatus[LpStatusInfeasible]
+    else:
+        status = LpStatus[LpStatusNotSolved]
+    return StaffingSolution(status, data['people'], data['tasks'], data['hours'], assignment,
+                            stopped=bool(control and control.cancelled))
+
+def solve_model_race(data, control=None, start_plan=None):
+    # Carrera entre motores en procesos separados (ver solver_race.py).
+    print("--- INICIANDO CARRERA DE SOLVERS (CBC vs HiGHS) ---")
+    solution, engine = solver_race.race_solve(data, control, start_plan)
+    if solution is None:
+        return StaffingSolution(LpStatus[LpStatusNotSolved], data['people'], data['tasks'], data['hours'],
+                                stopped=bool(control and control.cancelled))
+    return solution
+
+def solve_model_cbc(data, control=None, start_plan=None):
+    # Resuelve con CBC a través de PuLP, sobre el mismo modelo disperso por posiciones que HiGHS
+    # (model_builder.build_model), traducido a PuLP con model_builder.to_pulp.
+    people = data['people']
+    tasks = data['tasks']
+    hours = data['hours']
+    timelimit = int(data['timelimit'])
 
-    # Tomamos los datos guardados en el .json de la ejecución previa
+    print("--- INICIANDO CONSTRUCCIÓN DEL MODELO (Solver: CBC) ---")
+    # CBC no detecta simetrías: las personas intercambiables (mismos D, Q y F) se ordenan por carga
+    settings = solver_profiles.resolve_profile(data)
+    sm = model_builder.build_model(data, symmetry=True, continuous_aux=bool(settings.get('continuous_aux')))
+    print(f"Modelo: {sm.num_col} columnas, {sm.num_row} filas, {sm.num_nz} no-nulos"
+          f" ({len(sm.sym_classes)} clases de personas intercambiables)")
+    # Las variables se llaman por bloque y posición (X_0, W_3...): sin tildes ni símbolos en el .mps
+    model, variables = model_builder.to_pulp(sm)
+
+    # Arranque en caliente (mipStart de CBC). PuLP escribe todas las variables en el .mst
+    # (las que no tienen valor como 0), así que solo se usa si el plan reparado es completo.
+    use_warm_start = False
+    if start_plan is not None:
+        repaired, complete = warm_start.repair_assignment(start_plan, sm.D, sm.Q, sm.R)
+        if complete:
+            print("Arranque en caliente con el plan anterior (completo)")
+            idx, vals = sm.start_vector(repaired, complete=True)
+            for j, v in zip(idx.tolist(), vals.tolist()):
+                variables[j].setInitialValue(v)
+            use_warm_start = True
+        else:
+            print("El plan anterior no se pudo reparar por completo: CBC arranca sin solución inicial")
+
+    print(f"Ejecutando CBC (PuLP default) - TimeLimit: {timelimit}s...")
+    try:
+        # CancellableCBC = PULP_CBC_CMD cuyo subproceso se puede detener con el botón Stop
+        cbc_options = solver_profiles.cbc_options(settings)
+        model.solve(CancellableCBC(control, msg=1, timeLimit=timelimit, warmStart=use_warm_start, **cbc_options))
+    except Exception as e:
+        print(f"Error CBC: {e}")
+        # Si se detuvo a mano y CBC no dejó solución, no es que el modelo sea infactible
+        model.status = LpStatusNotSolved if (control and control.cancelled) else LpStatusInfeasible
+
+    # Volcado de la solución: vector por columnas -> array [personas, tareas, horas] con el mapeo del builder
+    assignment = None
+    if model.status == LpStatusOptimal:
+        col_value = np.array([v.varValue or 0.0 for v in variables])
+        assignment = sm.extract_assignment(col_value)
+    stopped = bool(control and control.cancelled)
+    proven = getattr(model, 'sol_status', None) == LpSolutionOptimal # CBC terminó sin límite de tiempo ni Stop
+    return StaffingSolution(LpStatus[model.status], people, tasks, hours, assignment, stopped=stopped, proven=proven)
+
+def solve_model_highs(data, control=None, start_plan=None, session=None):
+    # Resuelve con HiGHS construyendo las matrices directamente con NumPy (sin PuLP ni archivo .mps).
+    # Con una ModelSession, el modelo no se reconstruye: solo se actualizan cotas y costes.
     people = data['people']
     tasks = data['tasks']
     hours = data['hours']
-    D = data['D']
-    Q = data['Q']
-    R = data['R']
-    F = data['F']
-     
-    alpha = float(data['alpha'])
-    beta = float(data['beta'])
-    gamma = float(data['gamma'])
-    epsilon = float(data['epsilon'])
     timelimit = int(data['timelimit'])
-    solver_type = data.get('solver', 'highs') # 'cbc' o 'highs'
-    
-    # RESOLVEMOS EL MODELO
-    print(f"--- INICIANDO CONSTRUCCIÓN DEL MODELO (Solver: {solver_type.upper()}) ---")
-    model = LpProblem("Staffing", LpMinimize)
-
-    # 1. CAPA DE SEGURIDAD
-    # Convertimos los nombres de personas y de tareas en etiquetas genéricas (sin tildes ni símbolos raros)
-    # De esta manera, no habrá problemas para leer el archivo .mps
-    safe_people = [f"P{i}" for i in range(len(people))]
-    safe_tasks =  [f"T{i}" for i in range(len(tasks))]
-    
-    # 2. VARIABLES DE DECISIÓN (con etiquetas genéricas)
-    X_safe = LpVariable.dicts("X", (safe_people, safe_tasks, hours), cat='Binary')
-    W_safe = LpVariable.dicts("W", safe_people, lowBound=0, cat='Integer')
-    W_max = LpVariable("W_max", lowBound=0)
-    W_min = LpVariable("W_min", lowBound=0)
-    
-    hours_minus_last = hours[:-1]
-    Y_safe = LpVariable.dicts("Y", (safe_people, safe_tasks, hours_minus_last), cat='Binary')
-    hours_minus_first = hours[1:]
-    S_safe = LpVariable.dicts("S", (safe_people, hours_minus_first), cat='Binary')
-    U_safe = LpVariable.dicts("U", (safe_people, safe_tasks, hours), cat='Binary')
-
-    # 3. RECONSTRUCCIÓN DE DICCIONARIOS (Mapeo seguro con etiquetas genéricas -> Mapeo real)
-    X = {people[i]: {tasks[j]: {h: X_safe[safe_people[i]][safe_tasks[j]][h] for h in hours} for j in range(len(tasks))} for i in range(len(people))}
-    W = {people[i]: W_safe[safe_people[i]] for i in range(len(people))}
-    Y = {people[i]: {tasks[j]: {h: Y_safe[safe_people[i]][safe_tasks[j]][h] for h in hours_minus_last} for j in range(len(tasks))} for i in range(len(people))}
-    S = {people[i]: {h: S_safe[safe_people[i]][h] for h in hours_minus_first} for i in range(len(people))}
-    U = {people[i]: {tasks[j]: {h: U_safe[safe_people[i]][safe_tasks[j]][h] for h in hours} for j in range(len(tasks))} for i in range(len(people))}
-    
-    # 4. FUNCIÓN OBJETIVO
-    model += (
-        alpha * (W_max - W_min) +
-        beta * lpSum(Y[i][t][h] for i in people for t in tasks for h in hours_minus_last) +
-        gamma * lpSum(S[i][h] for i in people for h in hours_minus_first) +
-        epsilon * lpSum(U[i][t][h] for i in people for t in tasks for h in hours)
-    )
-    
-    # 5. RESTRICCIONES
-
-    # Una persona no debe hacer más de una tarea en una hora dada
-    for i in people:
-        for h in hours:
-            model += lpSum(X[i][t][h] for t in tasks) <= D[i][h]
-
-    # Todas las tareas de la matriz de requerimientos R deben ser satisfechas
-    for t in tasks:
-        for h in hours:
-            model += lpSum(X[i][t][h] for i in people) == R[t][h]
-
-    # Una persona no debe realizar más tareas a lo largo del día de lo que la matriz de disponibilidad Q dice
-    for i in people:
-        for t in tasks:
-            for h in hours:
-                model += X[i][t][h] <= Q[i][t]
-
-    # Nadie deberá hacer más horas que el máximo ni menos horas que el mínimo establecido por el modelo
-    for i in people:
-        model += W[i] == lpSum(X[i][t][h] for t in tasks for h in hours)
-        model += W_max >= W[i]
-        model += W_min <= W[i]
-
-    # (Restricción soft) En la medida de lo posible, se intentará que las personas no hagan dos tareas iguales en horas consecutivas
-    # Es decir, se evitará la monotonía
-    for i in people:
-        for t in tasks:
-            for h in hours_minus_last:
-                h_next = hours[hours.index(h) + 1]
-                model += Y[i][t][h] >= X[i][t][h] + X[i][t][h_next] - 1
-
-    # (Restricción soft) En la medida de lo posible, se intentará que no haya descansos intermedios entre tarea
-    # Es decir, se intentará que la gente trabaje todas sus horas de continuo
-    for i in people:
-        for h in hours_minus_first:
-            h_prev = hours[hours.index(h) - 1]
-            T_ih = lpSum(X[i][t][h] for t in tasks)
-            T_ih_prev = lpSum(X[i][t][h_prev] for t in tasks)
-            model += S[i][h] >= T_ih - T_ih_prev
-
-    # (Restricción soft) En la medida de lo posible, se obligará a las personas a respetar la matriz de obligatoriedad F
-    # Es decir, que si indicamos que la persona i debe trabajar en la tarea t en la hora h, deberá cumplirse
-    for i in people:
-        for t in tasks:
-            for h in hours:
-                model += U[i][t][h] >= F[i][t][h] - X[i][t][h]
-    
-    # =========================================================
-    # LÓGICA DE SELECCIÓN DE MOTOR
-    # =========================================================
-    
-    # --- OPCIÓN A: CBC (por defecto en PuLP) ---
-    if solver_type == 'cbc':
-        print(f"Ejecutando CBC (PuLP default) - TimeLimit: {timelimit}s...")
-        try:
-            # CBC rellena automáticamente las variables X_safe, W_safe, etc.
-            # Como X, W apuntan a ellas, no hace falta inyección manual.
-            model.solve(PULP_CBC_CMD(msg=1, timeLimit=timelimit))
-        except Exception as e:
-            print(f"Error CBC: {e}")
-            model.status = LpStatusInfeasible
-
-    # --- OPCIÓN B: HIGHS (MPS -> HIGHSPY) ---
-    else:
-        # Busca si se ha creado un archivo .mps
-        mps_file = "temp_staffing_model.mps"
-        if os.path.exists(mps_file): os.remove(mps_file)
-        
-        print(f"Exportando modelo a {mps_file}...")
-        model.writeMPS(mps_file)
-        print(f"Ejecutando Highs (native highspy)...")
-        
-        try:
-            h = highspy.Highs()
-            h.setOptionValue("time_limit", float(timelimit))
-            h.setOptionValue("output_flag", True) 
-            h.setOptionValue("presolve", "on")
-            
-            h.readModel(mps_file)
-            h.run()
-            
-            status_h = h.getModelStatus()
-            info = h.getInfo()
-            
-            print(f"Highs Code: {status_h}")
-            has_feasible_sol = (info.primal_solution_status == 2)
-            
-            if status_h == highspy.HighsModelStatus.kOptimal:
-                model.status = LpStatusOptimal
-            elif status_h == highspy.HighsModelStatus.kTimeLimit:
-                if has_feasible_sol:
-                    model.status = LpStatusOptimal
-                else:
-                    model.status = LpStatusNotSolved
-            elif status_h == highspy.HighsModelStatus.kInfeasible:
-                model.status = LpStatusInfeasible
+    # Opciones del perfil de solver (hilos, gap, esfuerzo de heurísticas, semilla, nodos) y formulación
+    settings = solver_profiles.resolve_profile(data)
+    options = solver_profiles.highs_options(settings)
+    continuous_aux = bool(settings.get('continuous_aux'))
+
+    print("--- INICIANDO CONSTRUCCIÓN DEL MODELO (Solver: HIGHS, en memoria) ---")
+    status = LpStatusUndefined
+    assignment = None
+    proven = False
+
+    try:
+        if session is not None:
+            sm = session.update(data, continuous_aux)
+        else:
+            sm = model_builder.build_model(data, continuous_aux=continuous_aux)
+        print(f"Modelo: {sm.num_col} columnas, {sm.num_row} filas, {sm.num_nz} no-nulos")
+
+        # Arranque en caliente: plan anterior reparado -> setSolution
+        start = None
+        if start_plan is not None:
+            repaired, complete = warm_start.repair_assignment(start_plan, sm.D, sm.Q, sm.R)
+            print(f"Arranque en caliente con el plan anterior ({'completo' if complete else 'parcial'})")
+            start = sm.start_vector(repaired, complete)
+
+        print(f"Ejecutando Highs (native highspy) - TimeLimit: {timelimit}s...")
+        if session is not None:
+            status_h, has_feasible_sol, assignment = session.solve(timelimit, control, start, options)
+        else:
+            status_h, has_feasible_sol, assignment = model_builder.solve_highs(sm, timelimit, control, start, options=options)
+        print(f"Highs Code: {status_h}")
+
+        if status_h == highspy.HighsModelStatus.kOptimal:
+            status = LpStatusOptimal
+            proven = True
+        elif status_h in (highspy.HighsModelStatus.kTimeLimit, highspy.HighsModelStatus.kInterrupt,
+                          highspy.HighsModelStatus.kSolutionLimit, highspy.HighsModelStatus.kIterationLimit):
+            # Límite de tiempo, de nodos (perfil) o botón Stop: nos quedamos con el mejor incumbente si existe
+            if has_feasible_sol:
+                status = LpStatusOptimal
             else:
-                model.status = LpStatusUndefined
+                status = LpStatusNotSolved
+        elif status_h == highspy.HighsModelStatus.kInfeasible:
+            status = LpStatusInfeasible
+        else:
+            status = LpStatusUndefined
 
-            # Inyección Manual para Highs
-            if has_feasible_sol:
-                solution = h.getSolution()
-                col_vals = solution.col_value
-                num_cols = h.getNumCol()
-                val_map = {}
-                for k in range(num_cols):
-                    ret = h.getColName(k)
-                    if isinstance(ret, tuple): _, col_name = ret 
-                    else: col_name = ret
-                    val_map[col_name] = round(col_vals[k])
-                
-                for v in model.variables():
-                    if v.name in val_map:
-                        v.varValue = val_map[v.name]
-                    else:
-                        v.varValue = 0 
-            
-        except Exception as e:
-            print(f"ERROR CRÍTICO HIGHS: {e}")
-            model.status = LpStatusInfeasible
-        finally:
-            if os.path.exists(mps_file):
-                try: os.remove(mps_file)
-                except: pass
+    except Exception as e:
+        print(f"ERROR CRÍTICO HIGHS: {e}")
+        status = LpStatusInfeasible
+        if session is not None:
+            session.reset() # La próxima optimización parte de un modelo limpio
 
-    return model, X, W, W_max, W_min
+    if status != LpStatusOptimal:
+        assignment = None
+    stopped = bool(control and control.cancelled)
+    return StaffingSolution(LpStatus[status], people, tasks, hours, assignment, stopped=stopped, proven=proven)
 
 # =============================================================================
 # APLICACIÓN PRINCIPAL (FLET)
@@ -221,8 +303,8 @@ class StaffingApp:
         # Carga inicial de datos
         self.data = load_data()
         
-        # Lista maestra de horas posibles (desde las 16:00 hasta las 08:00 del día siguiente)
-        self.possible_hours = [16, 17, 18, 19, 20, 21, 22, 23, 0, 1, 2, 3, 4, 5, 6, 7, 8]
+        # Calendario de franjas posibles (por defecto, de las 16:00 a las 08:00 del día siguiente en horas)
+        self.calendar = Calendar.from_json(self.data)
         
         # --- COLORES Y ESTILOS (CONSTANTES) ---
         self.COLOR_ACTIVE = "#C6EFCE"    # Verde Excel claro
@@ -262,9 +344,12 @@ class StaffingApp:
 
         self.input_people_val = ""
         self.input_tasks_val = ""
+
+        # Guardado automático: cada edición llama a autosaver.touch() y el estado se escribe en segundo plano
+        self.autosaver = autosave.AutoSaver(self.collect_data, save_data, AUTOSAVE_DELAY)
         
         # Inicializar horas activas desde el JSON cargado
-        for i in range(17):
+        for i in range(len(self.calendar)):
             active = 0
             if self.data and 'hours' in self.data and i in self.data['hours']:
                 active = 1
@@ -273,7 +358,25 @@ class StaffingApp:
         # Controles globales de UI
         self.status_text = ft.Text("Ready.", color="grey600", size=12)
         self.progress_bar = ft.ProgressBar(width=200, color="blue", bgcolor="#eeeeee", visible=False)
+        # Mini gráfico de convergencia (incumbente en azul, cota en gris) que alimenta HiGHS en vivo
+        self.progress_chart = ft.LineChart(
+            data_series=[
+                ft.LineChartData(data_points=[], stroke_width=2, color="blue", curved=False),
+                ft.LineChartData(data_points=[], stroke_width=1, color="grey400", curved=False),
+            ],
+            left_axis=ft.ChartAxis(show_labels=False, labels_size=0),
+            bottom_axis=ft.ChartAxis(show_labels=False, labels_size=0),
+            interactive=False, width=140, height=30, visible=False
+        )
         self.btn_optimize = None
+        self.solve_control = None # SolveControl de la optimización en curso (None si no hay ninguna)
+        self.model_session = ModelSession() # Modelo HiGHS en memoria entre optimizaciones
+        self.solution_cache = solution_cache.SolutionCache(CACHE_DIR, CACHE_MAX_ENTRIES)
+        try:
+            self.plan_store = plan_store.PlanStore(HISTORY_DB)
+        except sqlite3.Error as ex:
+            print(f"No se pudo abrir el historial de planes ({HISTORY_DB}): {ex}")
+            self.plan_store = None
         
         # Contenedores principales (Placeholders)
         self.content_matrices = ft.Column(spacing=20) 
@@ -289,6 +392,10 @@ class StaffingApp:
         self.page.window.height = 900
         self.page.theme_mode = ft.ThemeMode.LIGHT
         self.page.padding = 10
+        # Al cerrar la ventana se guarda lo pendiente antes de destruirla; on_disconnect queda como respaldo
+        self.page.window.prevent_close = True
+        self.page.window.on_event = self.on_window_event
+        self.page.on_disconnect = lambda e: self.autosaver.close()
 
         # Cargar valores por defecto en los campos de texto
         def_pers = '\n'.join(self.data.get('people', [])) if self.data else ""
@@ -350,7 +457,12 @@ class StaffingApp:
         self.in_beta = input_param("Beta (Penalizes having two identical tasks in consecutive hours) Recommended = 0.1", str(get_p('beta', 0.1)))
         self.in_gamma = input_param("Gamma (Penalizes having gaps between tasks) Recommended = 0.01", str(get_p('gamma', 0.01)))
         self.in_epsilon = input_param("Epsilon (Penalizes not obeying the mandatory tasks matrix) Recommended = 100", str(get_p('epsilon', 100)))
+        self.chk_hard_mandatory = ft.Checkbox(
+            label="Mandatory tasks are hard constraints (ignore Epsilon)",
+            value=get_p('mandatory_mode', 'soft') == 'hard'
+        )
         self.in_timelimit = input_param("Max Time (sec)", str(get_p('timelimit', 60)))
+        self.in_window = input_param("Rolling window (hours, used by 'Rolling horizon')", str(get_p('rolling_window', 8)))
 
         # === PANEL IZQUIERDO (Inputs y Configuración) ===
         people_task_row = ft.Row(
@@ -388,13 +500,58 @@ class StaffingApp:
         self.solver_selector = ft.RadioGroup(
             content=ft.Row([
                 ft.Radio(value="cbc", label="CBC (Standard)"),
-                ft.Radio(value="highs", label="HiGHS (Fast)")
-            ]),
+                ft.Radio(value="highs", label="HiGHS (Fast)"),
+                ft.Radio(value="heuristic", label="Heuristic (instant)"),
+                ft.Radio(value="race", label="Race (CBC vs HiGHS)"),
+                ft.Radio(value="rolling", label="Rolling horizon (long plans)"),
+                ft.Radio(value="crew", label="Crew (interchangeable staff)")
+            ], wrap=True),
             value=default_solver
         )
 
+        # Perfil de solver (hilos, gap, heurísticas, semilla, nodos); los valores se editan en el JSON
+        self.profiles = solver_profiles.load_profiles(self.data)
+        default_profile = get_p('profile', solver_profiles.DEFAULT_PROFILE)
+        if default_profile not in self.profiles: default_profile = solver_profiles.DEFAULT_PROFILE
+        self.profile_info = ft.Text(solver_profiles.describe(self.profiles[default_profile]), size=11, color="grey700")
+
+        def on_profile_change(e):
+            self.profile_info.value = solver_profiles.describe(self.profiles[self.profile_selector.value])
+            self.profile_info.update()
+
+        self.profile_selector = ft.Dropdown(
+            label="Solver profile",
+            options=[ft.dropdown.Option(name) for name in self.profiles],
+            value=default_profile, width=370, dense=True,
+            on_change=on_profile_change
+        )
+
+        # Calendario: fecha de inicio, número de días, turno (inicio/fin) y tamaño de franja
+        def calendar_field(label, value, width):
+            return ft.TextField(label=label, value=value, width=width, dense=True, text_size=12)
+
+        self.in_cal_date = calendar_field("Start date (YYYY-MM-DD)", self.calendar.start_date or "", 170)
+        self.in_venue = calendar_field("Venue (for the plan history)", get_p('venue', ""), 370)
+        self.in_venue.on_change = lambda e: self.autosaver.touch()
+        self.in_cal_days = calendar_field("Days", str(self.calendar.days), 60)
+        self.in_cal_start = calendar_field("Shift start", self.calendar.start, 90)
+        self.in_cal_end = calendar_field("Shift end", self.calendar.end, 90)
+        self.cal_granularity = ft.Dropdown(
+            label="Slot (min)", options=[ft.dropdown.Option(str(g)) for g in GRANULARITIES],
+            value=str(self.calendar.granularity), width=100, dense=True
+        )
+        calendar_row = ft.Column([
+            self.in_venue,
+            ft.Row([self.in_cal_date, self.in_cal_days, self.cal_granularity], spacing=5),
+            ft.Row([
+                self.in_cal_start, self.in_cal_end,
+                ft.OutlinedButton("Apply calendar", on_click=self.apply_calendar)
+            ], spacing=5),
+        ], spacing=5)
+
         config_below = ft.Column([
             ft.Text("3. Active Hours", color=self.COLOR_TEXT_HIGHLIGHT, weight="bold", size=20),
+            calendar_row,
             ft.Container(
                 content=self.container_hours, 
                 border=ft.border.all(1, self.COLOR_BORDER),
@@ -405,9 +562,11 @@ class StaffingApp:
             # AÑADIDO AQUI EL TEXTO Y EL SELECTOR
             ft.Text("4. Solver Engine", color=self.COLOR_TEXT_HIGHLIGHT, weight="bold", size=20),
             self.solver_selector,
+            self.profile_selector,
+            self.profile_info,
             ft.Divider(height=10),
             ft.Text("5. Parameters", color=self.COLOR_TEXT_HIGHLIGHT, weight="bold", size=20),
-            ft.Column([self.in_alpha, self.in_beta, self.in_gamma, self.in_epsilon, self.in_timelimit], spacing=2)
+            ft.Column([self.in_alpha, self.in_beta, self.in_gamma, self.in_epsilon, self.chk_hard_mandatory, self.in_timelimit, self.in_window], spacing=2)
         ], spacing=10)
 
         left_panel = ft.Container(
@@ -494,6 +653,7 @@ class StaffingApp:
                         self.btn_optimize,
                         ft.VerticalDivider(width=20),
                         self.progress_bar, 
+                        self.progress_chart,
                         self.status_text
                     ], alignment=ft.MainAxisAlignment.START, vertical_alignment=ft.CrossAxisAlignment.CENTER),
                     ft.Row([
@@ -514,22 +674,55 @@ class StaffingApp:
         self.generate_tables()
 
     def generate_hour_buttons(self):
-        # Genera dinámicamente los botones de selección de hora en dos filas.
-        row1 = ft.Row(wrap=False, spacing=2) 
-        row2 = ft.Row(wrap=False, spacing=2)
-        split_idx = 9
-        for i, h in enumerate(self.possible_hours):
-            is_active = self.state_hours.get(i, 0)
-            btn = ft.Container(
-                content=ft.Text(f"{h:02d}h", size=11, weight=ft.FontWeight.BOLD, color="white" if is_active else "black"),
-                width=38, height=25, bgcolor="#217346" if is_active else self.COLOR_NEUTRAL, 
-                alignment=ft.alignment.center, border_radius=5, on_click=lambda e, idx=i: self.toggle_hour(e, idx)
-            )
-            if i < split_idx: row1.controls.append(btn)
-            else: row2.controls.append(btn)
-        self.container_hours.controls = [row1, row2]
+        # Genera dinámicamente los botones de selección de franja: un bloque por día (con cabecera si hay varios).
+        btn_width = 38 if self.calendar.granularity == 60 else 44
+        controls = []
+        for d in range(self.calendar.days):
+            if self.calendar.days > 1:
+                controls.append(ft.Text(self.calendar.day_label(d), size=11, weight="bold", color="grey800"))
+            row = ft.Row(wrap=True, spacing=2, run_spacing=2)
+            for i in np.nonzero(self.calendar.day_of == d)[0].tolist():
+                is_active = self.state_hours.get(i, 0)
+                row.controls.append(ft.Container(
+                    content=ft.Text(self.calendar.short_label(i), size=11, weight=ft.FontWeight.BOLD, color="white" if is_active else "black"),
+                    width=btn_width, height=25, bgcolor="#217346" if is_active else self.COLOR_NEUTRAL,
+                    alignment=ft.alignment.center, border_radius=5, on_click=lambda e, idx=i: self.toggle_hour(e, idx)
+                ))
+            controls.append(row)
+        self.container_hours.controls = controls
         if self.page: self.page.update()
 
+    def on_window_event(self, e):
+        # Cierre de la ventana de escritorio: detiene el cálculo en curso, vuelca el guardado automático y cierra.
+        if e.type != ft.WindowEventType.CLOSE:
+            return
+        if self.solve_control is not None:
+            self.solve_control.cancel()
+        self.autosaver.close()
+        self.page.window.destroy()
+
+    def apply_calendar(self, e):
+        # Reconstruye el calendario con los valores de la sección y activa todas sus franjas.
+        # Las matrices D/R/F se indexan por franja: si cambia la rejilla, se vuelve a los valores por defecto.
+        try:
+            calendar = Calendar(
+                self.in_cal_date.value.strip() or None, int(self.in_cal_days.value),
+                self.in_cal_start.value.strip(), self.in_cal_end.value.strip(), int(self.cal_granularity.value)
+            )
+        except ValueError as ex:
+            self.status_text.value = f"Invalid calendar: {ex}"
+            self.status_text.update()
+            return
+        if calendar.slots != self.calendar.slots:
+            self.state_D, self.state_R, self.state_F = {}, {}, {}
+            if self.data:
+                self.data = {k: v for k, v in self.data.items() if k not in ('D', 'R', 'F')}
+        self.calendar = calendar
+        self.state_hours = {i: 1 for i in range(len(calendar))}
+        self.generate_hour_buttons()
+        self.generate_tables()
+        self.autosaver.touch()
+
     def toggle_hour(self, e, idx):
         # Callback al hacer click en una hora: cambia estado y regenera tablas.
         curr = self.state_hours[idx]
@@ -539,6 +732,7 @@ class StaffingApp:
         e.control.content.color = "white" if is_active else "black"
         e.control.update()
         self.generate_tables()
+        self.autosaver.touch()
 
     def on_input_change(self, e):
         # Detecta cambios en los cuadros de texto de Personas/Tareas.
@@ -549,6 +743,7 @@ class StaffingApp:
             if self.input_tasks_val == self.txt_tasks.value: return
             self.input_tasks_val = self.txt_tasks.value
         self.generate_tables()
+        self.autosaver.touch()
 
     def toggle_matrix_btn(self, e):
         # Manejador genérico para clicks en celdas tipo botón (D, Q, F).
@@ -575,6 +770,7 @@ class StaffingApp:
         if tipo == 'D': self.state_D.setdefault(k1, {})[k2] = new_val
         elif tipo == 'Q': self.state_Q.setdefault(k1, {})[k2] = new_val
         elif tipo == 'F': self.state_F.setdefault(k1, {}).setdefault(k2, {})[k3] = new_val
+        self.autosaver.touch()
         
         # Actualización Visual
         bg_color = "white"
@@ -659,12 +855,10 @@ class StaffingApp:
             cols = self.indices_horas
             rows = self.tasks
             
-            def reset_cell_R(t, h):
-                self.state_R.setdefault(t, {})[h] = 0
+            def reset_cell_R(t_idx, h_idx):
+                self.state_R.setdefault(rows[t_idx], {})[cols[h_idx]] = 0
                 try:
                     # Actualizar visualmente el TextField
-                    t_idx = self.tasks.index(t)
-                    h_idx = self.indices_horas.index(h)
                     tf = self.r_cells.get((t_idx, h_idx))
                     if tf:
                         tf.value = "" # Vacío visualmente es 0
@@ -672,10 +866,14 @@ class StaffingApp:
                 except:
                     pass
 
+            # Posiciones precalculadas: sin búsquedas .index() dentro del bucle
             if action_type == 'row':
-                for c in cols: reset_cell_R(key, c)
+                t_idx = rows.index(key)
+                for h_idx in range(len(cols)): reset_cell_R(t_idx, h_idx)
             elif action_type == 'col':
-                for r in rows: reset_cell_R(r, key)
+                h_idx = cols.index(key)
+                for t_idx in range(len(rows)): reset_cell_R(t_idx, h_idx)
+            self.autosaver.touch()
             return
         
         # --- CASO 2: Matrices Booleanas (D y Q) - Toggle YES/NO ---
@@ -761,7 +959,7 @@ class StaffingApp:
 
         # Dimensiones de celdas
         CELL_W_NAME = 80 
-        CELL_W_HOUR = 35  
+        CELL_W_HOUR = 35 if self.calendar.days == 1 and self.calendar.granularity == 60 else 60
         CELL_W_TASK = 50 
         CELL_W_TASK_LABEL = 80 
         CELL_W_BUTTON = 22 
@@ -795,7 +993,7 @@ class StaffingApp:
         rows_d = []
         header_controls = [ft.Container(width=CELL_W_BUTTON, height=CELL_H), cell_header("Person", CELL_W_NAME)]
         for h in self.indices_horas:
-            header_controls.append(cell_header(f"{self.possible_hours[h]:02d}h", CELL_W_HOUR))
+            header_controls.append(cell_header(self.calendar.label(h), CELL_W_HOUR))
         rows_d.append(ft.Row(controls=header_controls, spacing=2))
 
         for pers in self.people:
@@ -816,7 +1014,7 @@ class StaffingApp:
 
         header_r = [ft.Container(width=CELL_W_BUTTON, height=CELL_H), cell_header("Task", CELL_W_TASK_LABEL)]
         for h in self.indices_horas:
-            header_r.append(cell_header(f"{self.possible_hours[h]:02d}h", CELL_W_HOUR)) 
+            header_r.append(cell_header(self.calendar.label(h), CELL_W_HOUR)) 
         rows_r.append(ft.Row(controls=header_r, spacing=2))
 
         for i, t in enumerate(self.tasks):
@@ -862,7 +1060,7 @@ class StaffingApp:
             task_rows = []
             h_row = [cell_header("Person", CELL_W_NAME)]
             for h in self.indices_horas:
-                h_row.append(cell_header(f"{self.possible_hours[h]:02d}h", CELL_W_HOUR))
+                h_row.append(cell_header(self.calendar.label(h), CELL_W_HOUR))
             task_rows.append(ft.Row(controls=h_row, spacing=2))
 
             for pers in self.people:
@@ -965,6 +1163,7 @@ class StaffingApp:
                 try: new_val = int(val_str)
                 except ValueError: new_val = 0
             self.state_R.setdefault(t, {})[h] = new_val
+            self.autosaver.touch()
 
         def on_focus(e):
             # Seleccionar todo el texto al hacer foco
@@ -1004,13 +1203,24 @@ class StaffingApp:
 
     def run_optimization_thread(self, e):
         # Manejador del botón 'Optimize'. Lanza el cálculo en un hilo aparte.
+        # Si ya hay un cálculo en marcha, el mismo botón hace de 'Stop'.
+        if self.solve_control is not None:
+            self.solve_control.cancel()
+            self.btn_optimize.disabled = True
+            self.status_text.value = "Stopping... keeping the best plan found so far."
+            self.page.update()
+            return
+
         if not self.indices_horas:
             self.status_text.value = "Error: No hours."
             self.status_text.update()
             return
 
-        self.btn_optimize.disabled = True
+        self.solve_control = SolveControl(progress=ProgressChannel(self._on_solver_progress))
+        self._set_optimize_button(running=True)
         self.progress_bar.visible = True 
+        for series in self.progress_chart.data_series: series.data_points = []
+        self.progress_chart.visible = True
         self.status_text.value = "Optimizing (this may take a while)..."
         self.page.update()
 
@@ -1018,13 +1228,34 @@ class StaffingApp:
         t = threading.Thread(target=self._run_optimization)
         t.start()
 
+    def _on_solver_progress(self, latest, history):
+        # Recibe (ya con throttling) el progreso de HiGHS y lo pinta en la barra de estado.
+        parts = [f"Optimizing... {latest['elapsed']:.0f}s"]
+        if math.isfinite(latest['objective']): parts.append(f"incumbent {latest['objective']:.2f}")
+        if math.isfinite(latest['bound']): parts.append(f"bound {latest['bound']:.2f}")
+        if math.isfinite(latest['gap']): parts.append(f"gap {latest['gap']:.1%}")
+        self.status_text.value = " | ".join(parts)
+
+        incumbent_series, bound_series = self.progress_chart.data_series
+        incumbent_series.data_points = [ft.LineChartDataPoint(t, obj) for t, obj, _ in history if math.isfinite(obj)]
+        bound_series.data_points = [ft.LineChartDataPoint(t, bnd) for t, _, bnd in history if math.isfinite(bnd)]
+        self.page.update()
+
+    def _set_optimize_button(self, running):
+        # Alterna el botón principal entre 'CALCULATE (OPTIMIZE)' y 'STOP'.
+        self.btn_optimize.disabled = False
+        self.btn_optimize.text = "STOP" if running else "CALCULATE (OPTIMIZE)"
+        self.btn_optimize.style = ft.ButtonStyle(
+            shape=ft.RoundedRectangleBorder(radius=2), color="white", bgcolor="red" if running else "blue"
+        )
+
     def _run_optimization(self):
         # Función interna que ejecuta el proceso de optimización.
         try:
-            model, X, W, W_max, W_min = self.gather_data_and_solve()
-            status_txt = LpStatus[model.status]
-            self.status_text.value = f"Finished: {status_txt}"
-            self.show_results_dialog(model, X, W, W_max, W_min)
+            solution = self.gather_data_and_solve()
+            self.solve_control.progress.close() # No más actualizaciones de progreso tras terminar
+            self.status_text.value = f"Finished: {solution.status}" + (" (stopped by user)" if solution.stopped else "") + (" (cached)" if solution.cached else "")
+            self.show_results_dialog(solution)
         except Exception as ex:
             import traceback
             traceback.print_exc()
@@ -1033,12 +1264,16 @@ class StaffingApp:
             self.page.snack_bar.open = True
             self.page.update()
         finally:
-            self.btn_optimize.disabled = False
+            self.solve_control.progress.close()
+            self.solve_control = None
+            self._set_optimize_button(running=False)
             self.progress_bar.visible = False 
+            self.progress_chart.visible = False
             self.page.update()
 
-    def gather_data_and_solve(self):
-        # Recopila todos los datos de la UI, los guarda y llama al solver.
+    def collect_data(self):
+        # Recopila todos los datos de la UI en el formato que se guarda en DATA_FILE (ver data_schema.py).
+        # Solo lee el estado: se llama también desde el hilo de guardado automático.
         def get_val(ctrl):
             try: return float(ctrl.controls[1].content.value)
             except: return 0.0
@@ -1051,13 +1286,13 @@ class StaffingApp:
                 val = self.state_R.get(t, {}).get(h, 0)
                 R_data[t][h] = val
 
+        # F dispersa: solo las celdas obligatorias (F=1)
         F_save = {}
         for pers in self.people:
-            F_save[pers] = {}
             for t in self.tasks:
-                F_save[pers][t] = {}
                 for h in self.indices_horas:
-                    F_save[pers][t][str(h)] = self.state_F.setdefault(pers, {}).setdefault(t, {}).get(h, 0)
+                    if self.state_F.get(pers, {}).get(t, {}).get(h, 0):
+                        F_save.setdefault(pers, {}).setdefault(t, {})[str(h)] = 1
 
         # Capturamos el solver seleccionado
         selected_solver = self.solver_selector.value
@@ -1065,32 +1300,120 @@ class StaffingApp:
         final_data = {
             'people': self.people, 'tasks': self.tasks, 'hours': self.indices_horas,
             'D': {k: {str(idx): v for idx, v in d.items()} for k, d in self.state_D.items()},
-            'Q': self.state_Q,
+            'Q': {k: dict(d) for k, d in self.state_Q.items()}, # Copia: la UI puede seguir editando mientras se guarda
             'R': {k: {str(idx): v for idx, v in d.items()} for k, d in R_data.items()},
             'F': F_save,
             'alpha': get_val(self.in_alpha), 'beta': get_val(self.in_beta), 'gamma': get_val(self.in_gamma),
             'epsilon': get_val(self.in_epsilon), 'timelimit': int(get_val(self.in_timelimit)),
-            'solver': selected_solver # <--- GUARDAMOS LA SELECCIÓN
+            'mandatory_mode': 'hard' if self.chk_hard_mandatory.value else 'soft',
+            'rolling_window': int(get_val(self.in_window)),
+            'solver': selected_solver, # <--- GUARDAMOS LA SELECCIÓN
+            'profile': self.profile_selector.value, 'profiles': self.profiles,
+            'calendar': self.calendar.to_json(),
+            'venue': self.in_venue.value.strip()
         }
-        # Persistencia
-        save_data(final_data)
+        return final_data
+
+    def gather_data_and_solve(self):
+        # Recopila todos los datos de la UI, los guarda y llama al solver.
+        final_data = self.collect_data()
+        # Persistencia (inmediata, por el mismo canal que el guardado automático)
+        self.autosaver.save(final_data)
 
         # Preparar datos para el Solver
         solver_data = final_data.copy()
         solver_data['D'] = {k: {int(idx): v for idx, v in d.items()} for k, d in final_data['D'].items()}
         solver_data['R'] = {k: {int(idx): v for idx, v in d.items()} for k, d in final_data['R'].items()}
-        F_solver = {}
-        for i in self.people:
-            F_solver[i] = {}
-            for t in self.tasks:
-                F_solver[i][t] = {}
-                for h in self.indices_horas: 
-                    F_solver[i][t][h] = self.state_F.get(i, {}).get(t, {}).get(h, 0)
-        solver_data['F'] = F_solver
+        # F dispersa, como la guardada: solo las celdas obligatorias (data_to_arrays pone 0 en el resto)
+        solver_data['F'] = {
+            i: {t: {int(h): v for h, v in hv.items()} for t, hv in tv.items()} for i, tv in final_data['F'].items()
+        }
+        solver_data['segments'] = self.calendar.segments(self.indices_horas)
+
+        plan_file = warm_start.last_plan_path(DATA_FILE)
+
+        # Caché de soluciones: si estas entradas ya se resolvieron hasta el óptimo, se devuelve el plan guardado al instante
+        cache_key = solution_cache.input_hash(final_data)
+        started = time.monotonic()
+        cached = self.solution_cache.get(cache_key, self.people, self.tasks, self.indices_horas)
+        if self.solution_cache.is_final(cached):
+            print("Plan recuperado de la caché de soluciones")
+            solution = cached
+            solution.segments = solver_data['segments']
+            solution.feasibility = feasibility.check_feasibility(
+                *model_builder.data_to_arrays(solver_data), hard_mandatory=is_hard_mandatory(solver_data)
+            )
+        else:
+            # Solución inicial: el plan no demostrado de la caché para estas entradas o, si no hay,
+            # el plan anterior (guardado junto al JSON)
+            if cached is not None:
+                print("Plan no demostrado en la caché: se usa como arranque en caliente")
+                start_plan = cached.assignment
+            else:
+                start_plan = warm_start.load_last_plan(plan_file, self.people, self.tasks, self.indices_horas)
+            solution = solve_model(solver_data, self.solve_control, start_plan, self.model_session)
+            self.solution_cache.put(cache_key, solution)
+
+        if solution.is_feasible:
+            warm_start.save_last_plan(solution, plan_file)
+        # Historial: cada ejecución (también las de la caché) queda registrada con sus entradas y KPIs
+        if self.plan_store is not None:
+            try:
+                self.plan_store.record(final_data, solution, cache_key, time.monotonic() - started)
+            except sqlite3.Error as ex:
+                print(f"No se pudo guardar la ejecución en el historial: {ex}")
+        return solution
+
+    def show_feasibility_dialog(self, report):
+        # Ventana con la demanda R por tarea y hora, resaltando en rojo las celdas imposibles de cubrir
+        # según la comprobación previa (sin haber construido ni resuelto el modelo).
+        hour_labels = [self.calendar.label(h) for h in self.indices_horas]
+        messages = report.describe(self.people, self.tasks, hour_labels)
+
+        def make_cell(content, width, bgcolor="white", border=None, tooltip=None):
+            return ft.Container(
+                content=content, width=width, height=20, bgcolor=bgcolor, tooltip=tooltip,
+                alignment=ft.alignment.center, border=border, border_radius=3
+            )
 
-        return solve_model(solver_data)
+        header = [make_cell(ft.Text("Task", weight="bold", size=11), 100, bgcolor="#F2F2F2")]
+        header += [make_cell(ft.Text(lbl, weight="bold", size=11), 50, bgcolor="#F2F2F2") for lbl in hour_labels]
+        rows = [ft.Row(header, spacing=2)]
+        for t_idx, t in enumerate(self.tasks):
+            cells = [make_cell(ft.Text(t, weight="bold", size=11), 100)]
+            for h_idx in range(len(self.indices_horas)):
+                required = int(report.required[t_idx, h_idx])
+                bad = report.cells[t_idx, h_idx]
+                cells.append(make_cell(
+                    ft.Text(str(required) if required else "", size=10, weight="bold", color="red" if bad else "black"),
+                    50,
+                    bgcolor="red100" if bad else "white",
+                    border=ft.border.all(2, "red") if bad else None,
+                    tooltip=f"Required {required}, qualified & available {int(report.supply[t_idx, h_idx])}"
+                ))
+            rows.append(ft.Row(cells, spacing=2))
 
-    def save_excel_results(self, X, W):
+        content_dlg = ft.Container(
+            content=ft.Column([
+                ft.Text("The requirements cannot be covered (no model was built):", weight="bold", color="red"),
+                ft.Column([ft.Text(msg, size=12) for msg in messages], spacing=2),
+                ft.Divider(),
+                ft.Row([ft.Column(rows, spacing=2)], scroll=ft.ScrollMode.AUTO),
+            ], scroll=ft.ScrollMode.AUTO, spacing=6),
+            width=min(1200, 140 + len(self.indices_horas) * 52),
+            height=min(600, 120 + (len(messages) + len(self.tasks)) * 22),
+        )
+        dlg = ft.AlertDialog(
+            title=ft.Text("Infeasible Requirements", color="red"),
+            content=content_dlg,
+            actions=[ft.TextButton("Close", on_click=lambda e: self.page.close(dlg))],
+            shape=ft.RoundedRectangleBorder(radius=5),
+            modal=True,
+        )
+        self.page.open(dlg)
+        self.page.update()
+
+    def save_excel_results(self, solution):
         # Exporta los resultados a un archivo Excel formateado.
         try:
             wb = openpyxl.Workbook()
@@ -1105,7 +1428,7 @@ class StaffingApp:
             full_border = Border(left=border_style, right=border_style, top=border_style, bottom=border_style)
 
             # Cabeceras
-            headers = ["Person"] + [f"{self.possible_hours[h]:02d}h" for h in self.indices_horas] + ["Total"]
+            headers = ["Person"] + [self.calendar.label(h) for h in self.indices_horas] + ["Total"]
             ws.append(headers)
 
             for col_num, cell in enumerate(ws[1], 1):
@@ -1116,7 +1439,7 @@ class StaffingApp:
                 ws.column_dimensions[get_column_letter(col_num)].width = 15
 
             # Rellenar datos
-            for i in self.people:
+            for p_idx, i in enumerate(self.people):
                 row_idx = ws.max_row + 1
                 
                 cell_name = ws.cell(row=row_idx, column=1, value=i)
@@ -1133,12 +1456,10 @@ class StaffingApp:
                         color_hex = self.FLET_TO_HEX["red100"]
 
                     # Verificar si se asignó tarea
-                    for t in self.tasks:
-                        if value(X[i][t][h]) == 1:
-                            assigned_task = t
-                            flet_color = self.task_colors.get(t, "white")
-                            color_hex = self.FLET_TO_HEX.get(flet_color, "FFFFFF")
-                            break
+                    assigned_task = solution.task_name(p_idx, idx_h)
+                    if assigned_task:
+                        flet_color = self.task_colors.get(assigned_task, "white")
+                        color_hex = self.FLET_TO_HEX.get(flet_color, "FFFFFF")
                     
                     cell = ws.cell(row=row_idx, column=idx_h + 2, value=assigned_task)
                     cell.alignment = center_align
@@ -1146,8 +1467,7 @@ class StaffingApp:
                     cell.fill = PatternFill(start_color=color_hex, end_color=color_hex, fill_type="solid")
 
                 # Columna Total
-                val_load = value(W[i]) if value(W[i]) is not None else 0
-                cell_total = ws.cell(row=row_idx, column=len(self.indices_horas) + 2, value=int(val_load))
+                cell_total = ws.cell(row=row_idx, column=len(self.indices_horas) + 2, value=int(solution.load[p_idx]))
                 cell_total.font = Font(bold=True)
                 cell_total.alignment = center_align
                 cell_total.border = full_border
@@ -1175,12 +1495,19 @@ class StaffingApp:
             self.page.snack_bar.open = True
             self.page.update()
 
-    def show_results_dialog(self, model, X, W, W_max, W_min):
+    def show_results_dialog(self, solution):
         # Muestra una ventana modal con el resultado de la optimización (grid coloreado y métricas).
-        status_txt = LpStatus[model.status]
+        status_txt = solution.status
         
+        report = solution.feasibility
+
+        # Caso: la comprobación previa encontró celdas de demanda imposibles de cubrir
+        if report is not None and not report.is_feasible:
+            self.show_feasibility_dialog(report)
+            return
+
         # Caso: No se encontró solución
-        if status_txt != "Optimal":
+        if not solution.is_feasible:
             content_dlg = ft.Container(
                 content=ft.Column([
                     ft.Icon(ft.Icons.WARNING, color="red", size=40),
@@ -1204,68 +1531,27 @@ class StaffingApp:
             return
         
         # === CASO ÓPTIMO ===
-        val_wmax = value(W_max) if value(W_max) is not None else 0
-        val_wmin = value(W_min) if value(W_min) is not None else 0
-        load_gap = int(val_wmax - val_wmin)
-
-        # --- 1. PRE-CÁLCULO DE MÉTRICAS Y DESCANSOS ---
-        total_monotony = 0
-        total_breaks = 0
-        
-        # Diccionario para saber rápidamente qué celdas marcar con borde rojo
-        # Clave: (persona, indice_hora_absoluto), Valor: True
-        break_cells_map = {} 
-
-        for p in self.people:
-            # A) Monotonía
-            for t in self.tasks:
-                for idx in range(len(self.indices_horas) - 1):
-                    h_curr = self.indices_horas[idx]
-                    h_next = self.indices_horas[idx+1]
-                    if value(X[p][t][h_curr]) == 1 and value(X[p][t][h_next]) == 1:
-                        total_monotony += 1
-            
-            # B) Identificar Descansos Intermedios exactos
-            # Construimos lista de índices donde la persona trabaja
-            working_indices = []
-            for idx_local, h_real in enumerate(self.indices_horas):
-                # Ver si trabaja en alguna tarea en esta hora
-                works_now = False
-                for t in self.tasks:
-                    if value(X[p][t][h_real]) == 1:
-                        works_now = True
-                        break
-                if works_now:
-                    working_indices.append(idx_local)
-            
-            # Si trabajó al menos 2 horas separadas, puede haber huecos en medio
-            if len(working_indices) >= 2:
-                start_idx = working_indices[0]
-                end_idx = working_indices[-1]
-                
-                # Recorremos el rango desde el inicio hasta el fin de su jornada
-                # Si un índice NO está en working_indices, es un descanso intermedio.
-                current = start_idx + 1
-                while current < end_idx:
-                    if current not in working_indices:
-                        # Es un descanso intermedio
-                        h_real_break = self.indices_horas[current]
-                        break_cells_map[(p, h_real_break)] = True
-                        
-                        # Contar solo bloques (si el anterior ya era descanso, no sumamos al contador global, 
-                        # pero SÍ marcamos la celda para pintarla)
-                        prev_is_break = ((current - 1) > start_idx) and ((current - 1) not in working_indices)
-                        if not prev_is_break:
-                            total_breaks += 1
-                            
-                    current += 1
+        # --- 1. MÉTRICAS Y DESCANSOS (calculadas sobre arrays, ver metrics.py) ---
+        metrics = solution.metrics
+        load_gap = metrics.load_gap
+        total_monotony = metrics.total_monotony
+        total_breaks = metrics.total_breaks
+
+        # Máscara [personas, horas] con las celdas a marcar con borde rojo (descansos intermedios)
+        break_mask = metrics.break_mask
+
+        # Máscara [personas, horas] con obligatoriedades F imposibles de cumplir (borde naranja)
+        if report is not None:
+            conflict_mask = report.mandatory_conflicts.any(axis=1)
+        else:
+            conflict_mask = np.zeros((len(self.people), len(self.indices_horas)), dtype=bool)
 
         # Estado local para controlar el Zoom
         zoom_state = {"scale": 1.0}
         
         # Constantes base
         BASE_W_NAME = 100
-        BASE_W_HOUR = 50
+        BASE_W_HOUR = 50 if self.calendar.days == 1 else 70
         BASE_W_TOTAL = 50
         BASE_H_ROW = 20
         BASE_FONT_SIZE = 11
@@ -1308,12 +1594,12 @@ class StaffingApp:
             # Header
             header_cells = [make_res_cell(ft.Text("Person", weight="bold", size=FONT_SIZE), W_NAME, bgcolor="#F2F2F2")]
             for h in self.indices_horas:
-                header_cells.append(make_res_cell(ft.Text(f"{self.possible_hours[h]:02d}h", weight="bold", size=FONT_SIZE), W_HOUR, bgcolor="#F2F2F2"))
+                header_cells.append(make_res_cell(ft.Text(self.calendar.label(h), weight="bold", size=FONT_SIZE), W_HOUR, bgcolor="#F2F2F2"))
             header_cells.append(make_res_cell(ft.Text("Total", weight="bold", size=FONT_SIZE), W_TOTAL, bgcolor="#F2F2F2"))
             rows.append(ft.Row(header_cells, spacing=2))
 
             # Filas de datos
-            for i in self.people:
+            for p_idx, i in enumerate(self.people):
                 row_cells = []
                 # Nombre persona
                 row_cells.append(ft.Container(
@@ -1322,7 +1608,7 @@ class StaffingApp:
                 ))
                 
                 # Celdas de horas
-                for idx in self.indices_horas:
+                for h_idx, idx in enumerate(self.indices_horas):
                     assigned_task = ''
                     bg_color = "white"
                     cell_border = None
@@ -1333,20 +1619,22 @@ class StaffingApp:
                         bg_color = "red100"
 
                     # Chequear tarea asignada
-                    for t in self.tasks:
-                        if value(X[i][t][idx]) == 1:
-                            assigned_task = t
-                            bg_color = self.task_colors[t]
-                            break
+                    assigned_task = solution.task_name(p_idx, h_idx)
+                    if assigned_task:
+                        bg_color = self.task_colors[assigned_task]
                     
                     # --- LÓGICA DE RESALTADO DE DESCANSOS ---
                     # Si esta celda está en nuestro mapa de descansos, aplicamos borde rojo
-                    if (i, idx) in break_cells_map:
+                    if break_mask[p_idx, h_idx]:
                         # Borde rojo grueso para resaltar
                         cell_border = ft.border.all(2, "red")
                         # Opcional: Si quieres que el fondo sea blanco puro para resaltar más
                         # bg_color = "white" 
 
+                    # F=1 que no se podía cumplir (persona no disponible/cualificada o sin demanda)
+                    if conflict_mask[p_idx, h_idx]:
+                        cell_border = ft.border.all(2, "orange")
+
                     row_cells.append(make_res_cell(
                         ft.Text(assigned_task, color="black", size=FONT_SIZE_SMALL, weight="bold"), 
                         W_HOUR, 
@@ -1355,8 +1643,7 @@ class StaffingApp:
                     ))
                 
                 # Total
-                val_load = value(W[i]) if value(W[i]) is not None else 0
-                row_cells.append(make_res_cell(ft.Text(str(int(val_load)), weight="bold", size=FONT_SIZE), W_TOTAL))
+                row_cells.append(make_res_cell(ft.Text(str(int(solution.load[p_idx])), weight="bold", size=FONT_SIZE), W_TOTAL))
                 rows.append(ft.Row(row_cells, spacing=2))
 
             return rows
@@ -1418,8 +1705,16 @@ class StaffingApp:
         color_mon = "red" if total_monotony > 0 else "black"
         color_brk = "red" if total_breaks > 0 else "black"
 
+        # Si se pulsó Stop, el plan es el mejor incumbente encontrado hasta ese momento
+        if solution.stopped:
+            plan_title = "Best Plan So Far (stopped)"
+        elif solution.status == "Feasible":
+            plan_title = "Feasible Plan (not proven optimal)"
+        else:
+            plan_title = "Optimal Plan"
+
         title_dlg = ft.Row([
-            ft.Text(f"Optimal Plan | Load Δ: {load_gap}", weight="bold", size=16),
+            ft.Text(f"{plan_title} | Load Δ: {load_gap}", weight="bold", size=16),
             ft.VerticalDivider(width=10),
             ft.Text(f"Same task in 2 consecutive hours: {total_monotony}", weight="bold", size=16, color=color_mon),
             ft.VerticalDivider(width=10),
@@ -1432,7 +1727,7 @@ class StaffingApp:
                     zoom_bar,
                     ft.Container(expand=True),
                     ft.ElevatedButton("Download Excel", icon=ft.Icons.DOWNLOAD, 
-                                      on_click=lambda e: self.save_excel_results(X, W)),
+                                      on_click=lambda e: self.save_excel_results(solution)),
                     ft.TextButton("Close", on_click=lambda e: self.page.close(dlg))
                 ],
                 alignment=ft.MainAxisAlignment.START,
@@ -1454,5 +1749,7 @@ class StaffingApp:
     
 
 if __name__ == "__main__":
+    # En el ejecutable de PyInstaller (spawn), los procesos del modo carrera no deben relanzar la UI
+    multiprocessing.freeze_support()
     app = StaffingApp()
     ft.app(target=app.main, view=ft.AppView.FLET_APP)
\ No newline at end of file
@@ -0,0 +1,86 @@
+# Métricas de calidad del plan (monotonía, descansos intermedios, diferencia de carga)
+# calculadas sobre el array de asignación con operaciones NumPy, en una sola pasada para todas las personas.
+import numpy as np
+from calendar_slots import contiguous_next
+
+
+class PlanMetrics:
+    """
+    KPIs de un plan, con desgloses por persona y por hora para que la UI y los exportadores
+    los reutilicen sin recalcular.
+    - monotony_per_person / monotony_per_hour: misma tarea en dos horas consecutivas del mismo turno
+      (por hora se cuenta en la primera hora del par).
+    - break_mask: bool [personas, horas], True en las horas libres entre la primera y la última hora
+      trabajada de cada turno.
+    - breaks_per_person / breaks_per_hour: bloques de descanso intermedio (por hora, donde empieza el bloque).
+    - load: horas trabajadas por persona; load_gap: máximo - mínimo.
+    """
+    def __init__(self, monotony_per_person, monotony_per_hour, break_mask, break_starts, load):
+        self.monotony_per_person = monotony_per_person
+        self.monotony_per_hour = monotony_per_hour
+        self.break_mask = break_mask
+        self.breaks_per_person = break_starts.sum(axis=1)
+        self.breaks_per_hour = break_starts.sum(axis=0)
+        self.load = load
+
+        self.total_monotony = int(monotony_per_person.sum())
+        self.total_breaks = int(self.breaks_per_person.sum())
+        self.load_gap = int(load.max() - load.min()) if load.size else 0
+
+
+def compute_metrics(assignment, segments=None):
+    # Calcula todas las métricas a partir del array int8 [personas, tareas, horas].
+    # segments: turno de cada hora (calendario de varios días); sin él, todo es un único turno.
+    A = np.asarray(assignment, dtype=bool)
+    P, T, H = A.shape
+    linked = contiguous_next(segments, H)
+
+    # A) Monotonía: misma tarea en la hora h y en la siguiente (del mismo turno)
+    repeats = A[:, :, :-1] & A[:, :, 1:] & linked[None, None, :] # (P, T, H-1)
+    monotony_per_person = repeats.sum(axis=(1, 2))
+    monotony_per_hour = np.zeros(H, dtype=np.int64)
+    monotony_per_hour[:-1] = repeats.sum(axis=(0, 1))
+
+    # B) Descansos intermedios: horas libres con trabajo antes y después dentro del mismo turno
+    works = A.any(axis=1) # (P, H)
+    seg = np.asarray(segments) if segments else np.zeros(H, dtype=np.int64)
+    break_mask = np.zeros((P, H), dtype=bool)
+    for s in np.unique(seg):
+        cols = np.nonzero(seg == s)[0]
+        w = works[:, cols]
+        worked_before = np.cumsum(w, axis=1) > 0
+        worked_after = np.cumsum(w[:, ::-1], axis=1)[:, ::-1] > 0
+        break_mask[:, cols] = ~w & worked_before & worked_after
+
+    # Un bloque de descanso empieza donde hay descanso y la hora anterior (del mismo turno) no lo era
+    prev_break = np.zeros_like(break_mask)
+    prev_break[:, 1:] = break_mask[:, :-1] & linked[None, :]
+    break_starts = break_mask & ~prev_break
+
+    load = A.sum(axis=(1, 2))
+    return PlanMetrics(monotony_per_person, monotony_per_hour, break_mask, break_starts, load)
+
+
+def objective_terms(assignment, F_arr, alpha, beta, gamma, epsilon, segments=None):
+    """
+    Desglose de la función objetivo del modelo para un plan:
+    alpha * (W_max - W_min) + beta * sum Y + gamma * sum S + epsilon * sum U.
+    Devuelve un dict con cada término ya ponderado y el total ('objective').
+    """
+    A = np.asarray(assignment, dtype=bool)
+    linked = contiguous_next(segments, A.shape[2])
+    works = A.any(axis=1).astype(np.int8)
+    load = A.sum(axis=(1, 2))
+    load_gap = int(load.max() - load.min()) if load.size else 0
+    monotony = int((A[:, :, :-1] & A[:, :, 1:] & linked[None, None, :]).sum())
+    # S: inicios de bloque tras la primera hora de cada turno
+    starts = int((np.maximum(works[:, 1:] - works[:, :-1], 0) * linked[None, :]).sum())
+    unmet = int(((np.asarray(F_arr) == 1) & ~A).sum())
+    terms = {
+        'load_gap': alpha * load_gap,
+        'monotony': beta * monotony,
+        'block_starts': gamma * starts,
+        'unmet_mandatory': epsilon * unmet,
+    }
+    terms['objective'] = sum(terms.values())
+    return terms
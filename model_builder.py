@@ -0,0 +1,518 @@
+# Construcción directa del modelo de staffing en arrays NumPy para HiGHS.
+# Evita crear objetos PuLP y el viaje de ida y vuelta por un archivo .mps:
+# las columnas, filas y coeficientes se generan por bloques y se pasan a
+# highspy.Highs().passModel en formato CSR.
+# Personas, tareas y horas son siempre posiciones 0..n-1; CBC reutiliza el mismo modelo vía to_pulp.
+import numpy as np
+import highspy
+import pulp
+import warm_start
+from calendar_slots import contiguous_next
+
+INF = highspy.kHighsInf
+
+# Hilos con los que se inicializó el planificador global de HiGHS en este proceso (es único por proceso
+# y no admite otro número de hilos sin reiniciarlo)
+_scheduler_threads = None
+
+
+class StaffingModel:
+    """
+    Modelo de staffing en formato matricial.
+    Guarda los vectores de columnas (coste, cotas, integralidad), las filas (cotas)
+    y la matriz de restricciones en CSR, además de los offsets de cada bloque de variables.
+    """
+    def __init__(self, num_people, num_tasks, num_hours):
+        self.num_people = num_people
+        self.num_tasks = num_tasks
+        self.num_hours = num_hours
+        self.sym_classes = [] # Clases de personas intercambiables (ruptura de simetría)
+        self.hard_mandatory = False # Obligatoriedades F como cotas de X en lugar de holguras U
+
+        # Bloques de columnas: nombre -> (inicio, tamaño)
+        self.blocks = {}
+        self.num_col = 0
+        self._col_cost = []
+        self._col_lower = []
+        self._col_upper = []
+        self._integrality = []
+
+        # Filas y entradas en formato COO (se compactan a CSR en finalize)
+        self.num_row = 0
+        self._row_lower = []
+        self._row_upper = []
+        self._entries_row = []
+        self._entries_col = []
+        self._entries_val = []
+
+    def add_cols(self, name, shape, cost, lower, upper, integer):
+        # Reserva un bloque de columnas y devuelve sus índices con la forma pedida.
+        size = int(np.prod(shape))
+        start = self.num_col
+        self.blocks[name] = (start, size)
+        self.num_col += size
+        self._col_cost.append(np.full(size, cost, dtype=np.float64))
+        self._col_lower.append(np.broadcast_to(np.asarray(lower, dtype=np.float64), (size,)).copy())
+        self._col_upper.append(np.broadcast_to(np.asarray(upper, dtype=np.float64), (size,)).copy())
+        var_type = highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+        self._integrality.append(np.full(size, int(var_type), dtype=np.int32))
+        return np.arange(start, start + size, dtype=np.int32).reshape(shape)
+
+    def add_rows(self, shape, lower, upper):
+        # Reserva un bloque de filas y devuelve sus índices con la forma pedida.
+        size = int(np.prod(shape))
+        start = self.num_row
+        self.num_row += size
+        self._row_lower.append(np.broadcast_to(np.asarray(lower, dtype=np.float64), (size,)).copy())
+        self._row_upper.append(np.broadcast_to(np.asarray(upper, dtype=np.float64), (size,)).copy())
+        return np.arange(start, start + size, dtype=np.int32).reshape(shape)
+
+    def add_entries(self, rows, cols, value):
+        # Añade coeficientes A[rows, cols] = value (rows y cols se difunden entre sí).
+        rows, cols = np.broadcast_arrays(rows, cols)
+        self._entries_row.append(rows.ravel())
+        self._entries_col.append(cols.ravel())
+        self._entries_val.append(np.full(rows.size, value, dtype=np.float64))
+
+    def finalize(self):
+        # Compacta columnas, filas y la matriz COO a arrays contiguos en CSR.
+        self.col_cost = np.concatenate(self._col_cost) if self._col_cost else np.zeros(0)
+        self.col_lower = np.concatenate(self._col_lower) if self._col_lower else np.zeros(0)
+        self.col_upper = np.concatenate(self._col_upper) if self._col_upper else np.zeros(0)
+        self.integrality = np.concatenate(self._integrality) if self._integrality else np.zeros(0, dtype=np.int32)
+        self.row_lower = np.concatenate(self._row_lower) if self._row_lower else np.zeros(0)
+        self.row_upper = np.concatenate(self._row_upper) if self._row_upper else np.zeros(0)
+
+        rows = np.concatenate(self._entries_row) if self._entries_row else np.zeros(0, dtype=np.int32)
+        cols = np.concatenate(self._entries_col) if self._entries_col else np.zeros(0, dtype=np.int32)
+        vals = np.concatenate(self._entries_val) if self._entries_val else np.zeros(0)
+
+        order = np.argsort(rows, kind='stable')
+        self.a_index = cols[order].astype(np.int32)
+        self.a_value = vals[order]
+        counts = np.bincount(rows, minlength=self.num_row)
+        self.a_start = np.zeros(self.num_row + 1, dtype=np.int32)
+        np.cumsum(counts, out=self.a_start[1:])
+        self.num_nz = int(self.a_index.size)
+
+        self._col_cost = self._col_lower = self._col_upper = self._integrality = None
+        self._row_lower = self._row_upper = None
+        self._entries_row = self._entries_col = self._entries_val = None
+        return self
+
+    def pass_to_highs(self, h):
+        # Carga el modelo en una instancia de highspy.Highs directamente desde los arrays.
+        return h.passModel(
+            self.num_col, self.num_row, self.num_nz,
+            int(highspy.MatrixFormat.kRowwise), int(highspy.ObjSense.kMinimize), 0.0,
+            self.col_cost, self.col_lower, self.col_upper,
+            self.row_lower, self.row_upper,
+            self.a_start, self.a_index, self.a_value,
+            self.integrality
+        )
+
+    def block_values(self, col_value, name, shape):
+        # Extrae del vector solución los valores de un bloque de variables.
+        start, size = self.blocks[name]
+        return np.asarray(col_value[start:start + size]).reshape(shape)
+
+    def start_vector(self, assignment, complete=True):
+        """
+        Traduce un plan [personas, tareas, horas] a una solución inicial para setSolution.
+        Si el plan es completo se dan valores a todas las columnas (X y las auxiliares W, Y, S, U
+        derivadas de X); si es parcial solo se fijan las X a 1 y HiGHS completa el resto.
+        Devuelve (índices de columna, valores).
+        """
+        A = self.symmetric_order(assignment)
+        x_start, x_size = self.blocks['X']
+        x_val = A.ravel()[self.x_flat].astype(np.float64)
+        if not complete:
+            ones = np.nonzero(x_val == 1)[0]
+            return (x_start + ones).astype(np.int32), x_val[ones]
+
+        load, Y, S, U = warm_start.auxiliary_values(A, self.F)
+        y_p, y_t, y_h = self.y_index
+        s_p, s_h = self.s_index
+        values = {
+            'X': x_val,
+            'W': load,
+            'W_max': [load.max() if load.size else 0],
+            'W_min': [load.min() if load.size else 0],
+            'Y': Y[y_p, y_t, y_h],
+            'S': S[s_p, s_h - 1],
+            'U': U[self.u_index],
+        }
+        col_value = np.zeros(self.num_col)
+        for name, vals in values.items():
+            start, size = self.blocks[name]
+            col_value[start:start + size] = vals
+        return np.arange(self.num_col, dtype=np.int32), col_value
+
+    def symmetric_order(self, assignment):
+        # Reordena las filas de cada clase de personas intercambiables por carga decreciente,
+        # para que el plan cumpla W[a] >= W[b] (ruptura de simetría) y sirva como solución inicial.
+        A = np.array(assignment, dtype=np.int8)
+        for members in self.sym_classes:
+            load = A[members].sum(axis=(1, 2))
+            A[members] = A[members[np.argsort(-load, kind='stable')]]
+        return A
+
+    def extract_assignment(self, col_value):
+        # Devuelve X como array denso int8 [personas, tareas, horas].
+        # Usa el mapeo columna -> posición precalculado (x_flat): un único slice, sin buscar nombres.
+        start, size = self.blocks['X']
+        assignment = np.zeros(self.num_people * self.num_tasks * self.num_hours, dtype=np.int8)
+        assignment[self.x_flat] = np.rint(col_value[start:start + size])
+        return assignment.reshape(self.num_people, self.num_tasks, self.num_hours)
+
+
+def to_pulp(model, name="Staffing"):
+    """
+    Traduce un StaffingModel finalizado a un LpProblem de PuLP (para CBC), fila a fila desde la CSR.
+    Coste lineal en columnas + no-nulos. Devuelve (problema, lista de variables en orden de columna).
+    """
+    variables = []
+    for block, (start, size) in model.blocks.items():
+        for k in range(size):
+            j = start + k
+            upper = model.col_upper[j]
+            variables.append(pulp.LpVariable(
+                f"{block}_{k}", lowBound=model.col_lower[j], upBound=None if upper >= INF else upper,
+                cat=pulp.LpInteger if model.integrality[j] else pulp.LpContinuous
+            ))
+
+    prob = pulp.LpProblem(name, pulp.LpMinimize)
+    cost_idx = np.nonzero(model.col_cost)[0]
+    prob += pulp.LpAffineExpression([(variables[j], model.col_cost[j]) for j in cost_idx.tolist()])
+
+    a_index = model.a_index.tolist()
+    a_value = model.a_value.tolist()
+    a_start = model.a_start.tolist()
+    for r in range(model.num_row):
+        expr = pulp.LpAffineExpression(
+            [(variables[a_index[k]], a_value[k]) for k in range(a_start[r], a_start[r + 1])]
+        )
+        lower, upper = model.row_lower[r], model.row_upper[r]
+        if lower == upper:
+            prob.addConstraint(pulp.LpConstraint(expr, pulp.LpConstraintEQ, f"R{r}", lower))
+            continue
+        if lower > -INF:
+            prob.addConstraint(pulp.LpConstraint(expr, pulp.LpConstraintGE, f"R{r}_lo", lower))
+        if upper < INF:
+            prob.addConstraint(pulp.LpConstraint(expr, pulp.LpConstraintLE, f"R{r}_up", upper))
+    return prob, variables
+
+
+def data_to_arrays(data):
+    # Convierte los diccionarios D, Q, R, F (claves por nombre/hora) a arrays densos.
+    # F puede ser dispersa (solo las celdas con F=1, ver data_schema.py): lo que falta vale 0.
+    people = data['people']
+    tasks = data['tasks']
+    hours = data['hours']
+    D, Q, R, F = data['D'], data['Q'], data['R'], data['F']
+
+    D_arr = np.array([[D[i][h] for h in hours] for i in people], dtype=np.int8).reshape(len(people), len(hours))
+    Q_arr = np.array([[Q[i][t] for t in tasks] for i in people], dtype=np.int8).reshape(len(people), len(tasks))
+    R_arr = np.array([[R[t][h] for h in hours] for t in tasks], dtype=np.int32).reshape(len(tasks), len(hours))
+    F_arr = np.zeros((len(people), len(tasks), len(hours)), dtype=np.int8)
+    p_pos = {i: k for k, i in enumerate(people)}
+    t_pos = {t: k for k, t in enumerate(tasks)}
+    h_pos = {h: k for k, h in enumerate(hours)}
+    for i, tasks_i in F.items():
+        if i not in p_pos:
+            continue
+        for t, hours_it in tasks_i.items():
+            if t not in t_pos:
+                continue
+            for h, value in hours_it.items():
+                if value and h in h_pos:
+                    F_arr[p_pos[i], t_pos[t], h_pos[h]] = value
+    return D_arr, Q_arr, R_arr, F_arr
+
+
+def profile_groups(D_arr, Q_arr, F_arr):
+    """
+    Agrupa a las personas por perfil: mismas filas de disponibilidad D, cualificación Q y
+    obligatoriedades F. Intercambiar los planes completos de dos personas del mismo perfil
+    no cambia el objetivo. Devuelve una lista de arrays de índices de persona (en orden creciente),
+    una por perfil (también los de una sola persona), ordenada por la primera persona de cada perfil.
+    """
+    P = D_arr.shape[0]
+    if P == 0:
+        return []
+    signature = np.concatenate([D_arr.reshape(P, -1), Q_arr.reshape(P, -1), F_arr.reshape(P, -1)], axis=1)
+    _, labels = np.unique(signature, axis=0, return_inverse=True)
+    labels = labels.ravel()
+    groups = [np.nonzero(labels == c)[0] for c in range(labels.max() + 1)]
+    groups.sort(key=lambda g: g[0])
+    return groups
+
+
+def interchangeable_classes(D_arr, Q_arr, F_arr):
+    # Perfiles con dos o más personas intercambiables (los que generan simetría).
+    return [g for g in profile_groups(D_arr, Q_arr, F_arr) if g.size >= 2]
+
+
+def build_model(data, structural=False, symmetry=False, continuous_aux=False):
+    """
+    Construye el modelo de staffing directamente en arrays, de forma dispersa:
+    solo se crean variables X para ternas (persona, tarea, hora) con Q=1, D=1 y R>0,
+    Y solo donde existen las dos X consecutivas, S solo donde la persona puede trabajar
+    y U solo donde F=1. Devuelve un StaffingModel ya finalizado.
+    Con structural=True las filas de demanda existen para todas las celdas (t, h) y D, Q, R y F quedan
+    en las cotas: un cambio de datos que no amplía las ternas factibles (m.support) se aplica después
+    con structural_bounds; si las amplía, la sesión reconstruye el modelo (ver model_session.py).
+    Con symmetry=True las personas intercambiables se ordenan por carga (W[a] >= W[b] dentro de cada clase).
+    Solo compensa en CBC: HiGHS detecta él mismo las simetrías (órbitas) y las filas extra se lo impiden.
+    Con continuous_aux=True, W, Y, S y U se declaran continuas: con X entera sus cotas y filas ya las
+    dejan enteras en el óptimo, así que solo se ramifica sobre X.
+    Las obligatoriedades F se tratan como lista dispersa de celdas (también en modo estructural):
+    con data['mandatory_mode'] == 'soft' (por defecto) cada celda tiene una holgura U penalizada con
+    epsilon; con 'hard' no hay U y la X de la celda se fija con cota inferior 1.
+    """
+    D_arr, Q_arr, R_arr, F_arr = data_to_arrays(data)
+    P, T, H = F_arr.shape
+
+    alpha = float(data['alpha'])
+    beta = float(data['beta'])
+    gamma = float(data['gamma'])
+    epsilon = float(data['epsilon'])
+
+    m = StaffingModel(P, T, H)
+    m.D, m.Q, m.R, m.F = D_arr, Q_arr, R_arr, F_arr
+
+    # Ternas factibles: la persona está cualificada, disponible y la tarea tiene demanda esa hora.
+    # Fuera de estas ternas X vale 0 siempre, así que ni se crea la variable ni su restricción.
+    feasible = (Q_arr[:, :, None] == 1) & (D_arr[:, None, :] == 1) & (R_arr[None, :, :] > 0)
+    # Soporte del modelo: las ternas con columna X (también en modo estructural, para no perder la dispersión)
+    support = feasible
+    m.support = support
+    x_p, x_t, x_h = np.nonzero(support)
+    works_possible = support.any(axis=1) # (P, H): la persona tiene alguna X en esa hora
+
+    # Obligatoriedades: solo las celdas con F=1, en cualquier modo
+    hard = data.get('mandatory_mode', 'soft') == 'hard'
+    m.hard_mandatory = hard
+    m.mandatory = np.nonzero(F_arr == 1)
+
+    # 1. VARIABLES (bloques de columnas)
+    # Modo 'hard': X >= 1 en las celdas obligatorias (si la celda no es factible el modelo es infactible,
+    # lo que check_feasibility ya detecta antes de resolver)
+    x_lower = (F_arr[x_p, x_t, x_h] == 1).astype(np.float64) if hard else 0
+    X = m.add_cols('X', (x_p.size,), 0.0, x_lower, feasible[x_p, x_t, x_h], integer=True)
+    x_col = np.full((P, T, H), -1, dtype=np.int32)
+    x_col[x_p, x_t, x_h] = X
+    m.x_index = (x_p, x_t, x_h)
+    m.x_flat = np.ravel_multi_index(m.x_index, (P, T, H))
+    m.x_col = x_col
+
+    aux_integer = not continuous_aux
+    W = m.add_cols('W', (P,), 0.0, 0, INF, integer=aux_integer)
+    W_max = m.add_cols('W_max', (1,), alpha, 0, INF, integer=False)[0]
+    W_min = m.add_cols('W_min', (1,), -alpha, 0, INF, integer=False)[0]
+
+    # Continuidad entre posiciones consecutivas: no la hay entre turnos/días distintos del calendario
+    linked = contiguous_next(data.get('segments'), H) # (H-1,)
+
+    # Y solo donde existen X[i,t,h] y X[i,t,h+1] dentro del mismo turno
+    y_p, y_t, y_h = np.nonzero(support[:, :, :-1] & support[:, :, 1:] & linked[None, None, :])
+    Y = m.add_cols('Y', (y_p.size,), beta, 0, 1, integer=aux_integer)
+    m.y_index = (y_p, y_t, y_h)
+
+    # S solo donde la persona puede trabajar en h (si no, S >= T_ih - T_ih_prev es trivial)
+    # y h no es la primera franja de un turno (empezar un turno no es un descanso intermedio)
+    s_p, s_h = np.nonzero(works_possible[:, 1:] & linked[None, :])
+    s_h = s_h + 1
+    S = m.add_cols('S', (s_p.size,), gamma, 0, 1, integer=aux_integer)
+    m.s_index = (s_p, s_h)
+
+    # U solo donde F=1 y en modo 'soft'. Si la X no existe o no es factible, el incumplimiento es
+    # seguro (U fijada a 1).
+    f_p, f_t, f_h = (np.empty(0, dtype=np.int64),) * 3 if hard else m.mandatory
+    f_x = x_col[f_p, f_t, f_h]
+    unmet = ~feasible[f_p, f_t, f_h]
+    U = m.add_cols('U', (f_p.size,), epsilon, unmet.astype(np.float64), 1, integer=aux_integer)
+    m.u_index = (f_p, f_t, f_h)
+
+    # 2. RESTRICCIONES (bloques de filas)
+
+    # Una persona no debe hacer más de una tarea en una hora dada: sum_t X[i,t,h] <= 1
+    # (solo hace falta donde la persona tiene al menos dos tareas posibles en esa hora)
+    multi_p, multi_h = np.nonzero(feasible.sum(axis=1) >= 2)
+    rows = m.add_rows((multi_p.size,), -INF, 1)
+    row_of = np.full((P, H), -1, dtype=np.int32)
+    row_of[multi_p, multi_h] = rows
+    sel = row_of[x_p, x_h] >= 0
+    m.add_entries(row_of[x_p, x_h][sel], X[sel], 1.0)
+
+    # Todas las tareas de la matriz de requerimientos R deben ser satisfechas: sum_i X[i,t,h] == R[t,h]
+    r_t, r_h = np.nonzero(np.ones(R_arr.shape, dtype=bool) if structural else R_arr > 0)
+    rows = m.add_rows((r_t.size,), R_arr[r_t, r_h], R_arr[r_t, r_h])
+    m.r_index = (r_t, r_h)
+    m.r_rows = rows
+    row_of = np.full((T, H), -1, dtype=np.int32)
+    row_of[r_t, r_h] = rows
+    m.add_entries(row_of[x_t, x_h], X, 1.0)
+
+    # Carga de trabajo: W[i] - sum X[i,·,·] == 0, W_max >= W[i], W_min <= W[i]
+    rows = m.add_rows((P,), 0, 0)
+    m.add_entries(rows, W, 1.0)
+    m.add_entries(rows[x_p], X, -1.0)
+    m.w_rows = rows
+    rows = m.add_rows((P,), 0, INF)
+    m.add_entries(rows, W_max, 1.0)
+    m.add_entries(rows, W, -1.0)
+    rows = m.add_rows((P,), 0, INF)
+    m.add_entries(rows, W, 1.0)
+    m.add_entries(rows, W_min, -1.0)
+
+    # Monotonía: Y[i,t,h] - X[i,t,h] - X[i,t,h+1] >= -1
+    rows = m.add_rows((y_p.size,), -1, INF)
+    m.add_entries(rows, Y, 1.0)
+    m.add_entries(rows, x_col[y_p, y_t, y_h], -1.0)
+    m.add_entries(rows, x_col[y_p, y_t, y_h + 1], -1.0)
+
+    # Descansos intermedios: S[i,h] - sum_t X[i,t,h] + sum_t X[i,t,h-1] >= 0
+    rows = m.add_rows((s_p.size,), 0, INF)
+    m.add_entries(rows, S, 1.0)
+    row_of = np.full((P, H + 1), -1, dtype=np.int32)
+    row_of[s_p, s_h] = rows
+    sel = row_of[x_p, x_h] >= 0
+    m.add_entries(row_of[x_p, x_h][sel], X[sel], -1.0)
+    sel = row_of[x_p, x_h + 1] >= 0
+    m.add_entries(row_of[x_p, x_h + 1][sel], X[sel], 1.0)
+
+    # Obligatoriedades: U[i,t,h] + X[i,t,h] >= 1 (solo para las F=1 con X existente)
+    sel = f_x >= 0
+    rows = m.add_rows((int(sel.sum()),), 1, INF)
+    m.add_entries(rows, U[sel], 1.0)
+    m.add_entries(rows, f_x[sel], 1.0)
+    m.u_sel = sel
+    m.u_rows = rows
+
+    # Ruptura de simetría: en cada clase de personas intercambiables, W[a_0] >= W[a_1] >= ...
+    # (sin ella el branch and bound explora todas las permutaciones de un mismo plan)
+    m.sym_classes = interchangeable_classes(D_arr, Q_arr, F_arr) if symmetry else []
+    if m.sym_classes:
+        first = np.concatenate([c[:-1] for c in m.sym_classes])
+        second = np.concatenate([c[1:] for c in m.sym_classes])
+        rows = m.add_rows((first.size,), 0, INF)
+        m.add_entries(rows, W[first], 1.0)
+        m.add_entries(rows, W[second], -1.0)
+
+    return m.finalize()
+
+
+def structural_bounds(m, D_arr, Q_arr, R_arr, F_arr):
+    """
+    Recalcula las cotas de un modelo estructural (build_model(..., structural=True)) para unos
+    datos D, Q, R, F nuevos con las mismas personas, tareas y horas, las mismas celdas con F=1 y
+    ninguna terna factible fuera de m.support (si no, el modelo se reconstruye, ver ModelSession.update).
+    Devuelve (col_lower, col_upper, row_lower, row_upper) completos, listos para compararse con los del modelo.
+    """
+    feasible = (Q_arr[:, :, None] == 1) & (D_arr[:, None, :] == 1) & (R_arr[None, :, :] > 0)
+    col_lower, col_upper = m.col_lower.copy(), m.col_upper.copy()
+    row_lower, row_upper = m.row_lower.copy(), m.row_upper.copy()
+
+    # X: cota superior 1 solo en las ternas factibles (e inferior 1 en las obligatorias en modo 'hard')
+    x_start, x_size = m.blocks['X']
+    col_upper[x_start:x_start + x_size] = feasible[m.x_index]
+    if m.hard_mandatory:
+        col_lower[x_start:x_start + x_size] = F_arr[m.x_index] == 1
+
+    # R: sum_i X[i,t,h] == R[t,h]
+    demand = R_arr[m.r_index]
+    row_lower[m.r_rows] = demand
+    row_upper[m.r_rows] = demand
+
+    # F (modo 'soft'): U fijada a 1 si la obligatoriedad ya no se puede cumplir
+    u_start, u_size = m.blocks['U']
+    col_lower[u_start:u_start + u_size] = ~feasible[m.u_index]
+    return col_lower, col_upper, row_lower, row_upper
+
+
+def objective_costs(m, alpha, beta, gamma, epsilon):
+    # Vector de costes del modelo para unos pesos alpha/beta/gamma/epsilon dados.
+    col_cost = np.zeros(m.num_col)
+    for name, cost in (('W_max', alpha), ('W_min', -alpha), ('Y', beta), ('S', gamma), ('U', epsilon)):
+        start, size = m.blocks[name]
+        col_cost[start:start + size] = cost
+    return col_cost
+
+
+def _prepare_scheduler(threads):
+    # Reinicia el planificador global de HiGHS si la optimización pide otro número de hilos
+    # (p. ej. al cambiar de perfil en la UI); si no, HiGHS rechaza la ejecución.
+    global _scheduler_threads
+    if _scheduler_threads is not None and _scheduler_threads != threads:
+        highspy.Highs.resetGlobalScheduler(True)
+    _scheduler_threads = threads
+
+
+def solve_highs(model, timelimit, control=None, start=None, highs=None, options=None):
+    """
+    Resuelve un StaffingModel con highspy pasando el modelo en memoria.
+    Si se pasa un SolveControl, su cancel() interrumpe el solver conservando el mejor incumbente.
+    start: (índices, valores) de start_vector para arrancar en caliente (MIP start).
+    highs: instancia que ya tiene cargado el modelo (sesión persistente); si es None se crea una nueva.
+    options: dict de opciones HiGHS adicionales (p. ej. {'threads': 2}).
+    Devuelve (status_highs, has_feasible_sol, assignment), donde assignment es el array
+    int8 [personas, tareas, horas] de X (None si no hay solución factible).
+    """
+    h = highs if highs is not None else highspy.Highs()
+    if highs is not None:
+        h.resetOptions() # Instancia reutilizada: sin opciones heredadas de la ejecución anterior
+    h.setOptionValue("time_limit", float(timelimit))
+    h.setOptionValue("output_flag", True)
+    h.setOptionValue("presolve", "on")
+    options = dict(options or {})
+    _prepare_scheduler(int(options.get('threads', 0)))
+    for name, value in options.items():
+        h.setOptionValue(name, value)
+
+    publish_progress = interrupt = None
+    if control is not None:
+        # Interrupción cooperativa: HiGHS consulta control.cancelled en sus callbacks de interrupción.
+        # No se usa cancelSolve/HandleUserInterrupt: highspy solo limpia ese flag en startSolve, no en
+        # run(), y en una instancia reutilizada (sesión) un Stop interrumpiría todas las ejecuciones siguientes.
+        def interrupt(e):
+            if control.cancelled:
+                e.interrupt()
+        h.cbSimplexInterrupt.subscribe(interrupt)
+        h.cbIpmInterrupt.subscribe(interrupt)
+        h.cbMipInterrupt.subscribe(interrupt)
+
+        if control.progress is not None:
+            # Streaming de incumbente / cota / gap (el canal hace el throttling hacia la UI)
+            def publish_progress(e):
+                out = e.data_out
+                control.progress.publish(out.mip_primal_bound, out.mip_dual_bound, out.mip_gap, out.running_time)
+            h.cbMipImprovingSolution.subscribe(publish_progress)
+            h.cbMipLogging.subscribe(publish_progress)
+
+    if highs is None:
+        model.pass_to_highs(h)
+    if start is not None:
+        idx, vals = start
+        h.setSolution(int(idx.size), idx, vals)
+    try:
+        h.run()
+    finally:
+        if interrupt is not None:
+            h.cbSimplexInterrupt.unsubscribe(interrupt)
+            h.cbIpmInterrupt.unsubscribe(interrupt)
+            h.cbMipInterrupt.unsubscribe(interrupt)
+        if publish_progress is not None:
+            # La instancia puede reutilizarse (sesión): no dejar callbacks de esta ejecución colgados
+            h.cbMipImprovingSolution.unsubscribe(publish_progress)
+            h.cbMipLogging.unsubscribe(publish_progress)
+
+    status_h = h.getModelStatus()
+    info = h.getInfo()
+    has_feasible_sol = (info.primal_solution_status == 2)
+
+    assignment = None
+    if has_feasible_sol:
+        col_value = np.asarray(h.getSolution().col_value)
+        assignment = model.extract_assignment(col_value)
+    return status_h, has_feasible_sol, assignment
@@ -0,0 +1,114 @@
+# Sesión de modelo persistente para la UI: el modelo HiGHS se construye una vez y se queda en memoria.
+# Entre dos optimizaciones, los cambios de la UI (R[t][h], D[i][h], Q[i][t], F, pesos) se traducen
+# a cambios de cotas y costes sobre la misma instancia, sin reconstruir variables ni restricciones.
+import highspy
+import numpy as np
+import model_builder
+
+
+class ModelSession:
+    """
+    Modelo estructural (build_model(..., structural=True)) cargado en una instancia highspy.Highs.
+    Es tan disperso como el normal (X solo en las ternas factibles al construirlo, m.support); los
+    cambios que no amplían esas ternas solo tocan cotas y costes, sin reconstruir:
+    - R[t][h]           -> cotas de la fila de demanda (t, h).
+    - D[i][h], Q[i][t]  -> cota superior de las columnas X afectadas (0 si dejan de ser factibles).
+    - alpha..epsilon    -> costes de W_max, W_min, Y, S y U.
+    Las obligatoriedades F son una lista dispersa de celdas (U solo donde F=1), así que se reconstruye
+    desde cero si cambian las dimensiones (personas, tareas, franjas o sus turnos), las celdas con F=1,
+    su modo (mandatory_mode) o la formulación (continuous_aux), y también si aparece alguna terna
+    factible nueva (p. ej. cualificar a alguien para otra tarea) fuera de m.support.
+    """
+    def __init__(self):
+        self.model = None
+        self.highs = None
+        self._key = None
+
+    def update(self, data, continuous_aux=False):
+        # Deja el modelo en memoria al día con data. Devuelve el StaffingModel listo para solve_highs.
+        D_arr, Q_arr, R_arr, F_arr = model_builder.data_to_arrays(data)
+        key = (
+            tuple(data['people']), tuple(data['tasks']), tuple(data['hours']), tuple(data.get('segments') or ()),
+            bool(continuous_aux), data.get('mandatory_mode', 'soft'), tuple(np.flatnonzero(F_arr == 1).tolist())
+        )
+        if self.model is None or key != self._key:
+            self._rebuild(data, key, continuous_aux)
+            return self.model
+        feasible = (Q_arr[:, :, None] == 1) & (D_arr[:, None, :] == 1) & (R_arr[None, :, :] > 0)
+        if (feasible & ~self.model.support).any():
+            self._rebuild(data, key, continuous_aux)
+            return self.model
+
+        m, h = self.model, self.highs
+        col_lower, col_upper, row_lower, row_upper = model_builder.structural_bounds(m, D_arr, Q_arr, R_arr, F_arr)
+        col_cost = model_builder.objective_costs(
+            m, float(data['alpha']), float(data['beta']), float(data['gamma']), float(data['epsilon'])
+        )
+
+        cols = np.nonzero((col_lower != m.col_lower) | (col_upper != m.col_upper))[0].astype(np.int32)
+        if cols.size:
+            h.changeColsBounds(int(cols.size), cols, col_lower[cols], col_upper[cols])
+        rows = np.nonzero((row_lower != m.row_lower) | (row_upper != m.row_upper))[0]
+        for r in rows.tolist():
+            h.changeRowBounds(r, row_lower[r], row_upper[r])
+        costs = np.nonzero(col_cost != m.col_cost)[0].astype(np.int32)
+        if costs.size:
+            h.changeColsCost(int(costs.size), costs, col_cost[costs])
+
+        m.col_lower, m.col_upper, m.row_lower, m.row_upper, m.col_cost = col_lower, col_upper, row_lower, row_upper, col_cost
+        m.D, m.Q, m.R, m.F = D_arr, Q_arr, R_arr, F_arr
+        print(f"Sesión de modelo: {cols.size} cotas de columna, {rows.size} cotas de fila y {costs.size} costes actualizados")
+        return m
+
+    def reset(self):
+        # Descarta el modelo en memoria (la próxima update() lo reconstruye).
+        self.model = None
+        self.highs = None
+        self._key = None
+
+    def _rebuild(self, data, key, continuous_aux=False):
+        self.model = model_builder.build_model(data, structural=True, continuous_aux=continuous_aux)
+        self.highs = highspy.Highs()
+        self.model.pass_to_highs(self.highs)
+        self._key = key
+        print(f"Sesión de modelo: construido desde cero ({self.model.num_col} columnas, {self.model.num_row} filas)")
+
+    def solve(self, timelimit, control=None, start=None, options=None):
+        # Resuelve el modelo en memoria (misma interfaz y resultado que model_builder.solve_highs).
+        self.highs.clearSolver()
+        result = model_builder.solve_highs(self.model, timelimit, control, start, highs=self.highs, options=options)
+        if result[0] == highspy.HighsModelStatus.kInterrupt and not (control is not None and control.cancelled):
+            # Interrupción sin Stop: la instancia arrastra un estado inválido; la próxima update() la reconstruye
+            print("Sesión de modelo: HiGHS se interrumpió sin Stop, se descarta la instancia")
+            self.reset()
+        return result
+
+
+def _regression_check():
+    # Comprobación (python model_session.py): tras cambiar Q y D, la sesión debe dar lo mismo que un
+    # modelo construido desde cero, y nadie puede hacer dos tareas en la misma hora.
+    data = {
+        'people': ['A', 'B'], 'tasks': ['t1', 't2'], 'hours': [0, 1],
+        'D': {'A': {0: 1, 1: 1}, 'B': {0: 1, 1: 1}},
+        'Q': {'A': {'t1': 1, 't2': 0}, 'B': {'t1': 1, 't2': 1}},
+        'R': {'t1': {0: 1, 1: 1}, 't2': {0: 1, 1: 1}},
+        'F': {}, 'alpha': 1, 'beta': 0.1, 'gamma': 0.01, 'epsilon': 100,
+    }
+    session = ModelSession()
+    session.update(data)
+    session.solve(10)
+    for edit in ({'Q': ('A', 't2', 1)}, {'D': ('B', 0, 0)}):
+        for matrix, (k1, k2, value) in edit.items():
+            data[matrix][k1][k2] = value
+        session.update(data)
+        status_s, ok_s, plan_s = session.solve(10)
+        status_f, ok_f, plan_f = model_builder.solve_highs(model_builder.build_model(data), 10)
+        assert status_s == status_f, f"{edit}: sesión {status_s}, desde cero {status_f}"
+        if ok_s:
+            assert (plan_s.sum(axis=1) <= 1).all(), f"{edit}: dos tareas en la misma hora"
+            assert plan_s.sum() == plan_f.sum(), f"{edit}: planes distintos"
+    print("Sesión de modelo: comprobación de regresión correcta")
+
+
+if __name__ == "__main__":
+    _regression_check()
@@ -0,0 +1,272 @@
+# Historial de ejecuciones en SQLite: cada optimización guarda sus entradas (formato v2 de
+# data_schema.py), los ajustes del solver, el plan y sus KPIs, indexados por fecha del plan, sede
+# (venue) y hash de entradas. Listar, cargar y comparar cientos de planes antiguos son consultas
+# de milisegundos, en lugar de abrir los staffing_plan.xlsx exportados (que se sobrescriben).
+#
+# Uso desde la línea de comandos:
+#   python plan_store.py list --venue "Main hall" --from 2026-10-01
+#   python plan_store.py diff 12 15
+import argparse
+import datetime
+import json
+import sqlite3
+import threading
+import zlib
+import numpy as np
+import data_schema
+from calendar_slots import Calendar
+from metrics import objective_terms
+from solution import StaffingSolution
+
+SCHEMA_VERSION = 1
+DEFAULT_DB = "staffing_history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    plan_date TEXT NOT NULL,
+    venue TEXT NOT NULL DEFAULT '',
+    input_hash TEXT,
+    solver TEXT,
+    profile TEXT,
+    status TEXT NOT NULL,
+    proven INTEGER NOT NULL DEFAULT 0,
+    stopped INTEGER NOT NULL DEFAULT 0,
+    seconds REAL,
+    objective REAL,
+    load_gap REAL,
+    monotony REAL,
+    block_starts REAL,
+    unmet_mandatory REAL,
+    total_monotony INTEGER,
+    total_breaks INTEGER,
+    max_load INTEGER,
+    num_people INTEGER,
+    num_tasks INTEGER,
+    num_hours INTEGER,
+    inputs BLOB NOT NULL,
+    plan BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_by_date ON runs (plan_date, created_at);
+CREATE INDEX IF NOT EXISTS runs_by_venue ON runs (venue, plan_date);
+CREATE INDEX IF NOT EXISTS runs_by_hash ON runs (input_hash);
+"""
+
+# Columnas de list_runs (todo menos los blobs)
+SUMMARY_COLUMNS = (
+    'id', 'created_at', 'plan_date', 'venue', 'input_hash', 'solver', 'profile', 'status', 'proven',
+    'stopped', 'seconds', 'objective', 'load_gap', 'monotony', 'block_starts', 'unmet_mandatory',
+    'total_monotony', 'total_breaks', 'max_load', 'num_people', 'num_tasks', 'num_hours'
+)
+# KPIs que compara diff
+KPI_COLUMNS = (
+    'objective', 'load_gap', 'monotony', 'block_starts', 'unmet_mandatory', 'total_monotony', 'total_breaks', 'max_load'
+)
+
+
+def _pack_inputs(data):
+    # Entradas (formato en memoria) -> JSON v2 comprimido.
+    text = json.dumps(data_schema.to_disk(data), ensure_ascii=False, separators=(',', ':'))
+    return zlib.compress(text.encode('utf-8'))
+
+
+def _unpack_inputs(blob):
+    return data_schema.from_disk(json.loads(zlib.decompress(blob).decode('utf-8')))
+
+
+def _pack_plan(solution):
+    # Plan como tarea asignada por (persona, hora): int16 [personas, horas] comprimido (-1 = libre).
+    return zlib.compress(solution.assigned_task.astype('<i2').tobytes())
+
+
+def _unpack_plan(blob, num_people, num_hours):
+    return np.frombuffer(zlib.decompress(blob), dtype='<i2').reshape(num_people, num_hours)
+
+
+def _mandatory_array(data):
+    # F dispersa (claves de hora como texto) -> int8 [personas, tareas, horas].
+    p_pos = {p: i for i, p in enumerate(data['people'])}
+    t_pos = {t: i for i, t in enumerate(data['tasks'])}
+    h_pos = {int(h): i for i, h in enumerate(data['hours'])}
+    F_arr = np.zeros((len(p_pos), len(t_pos), len(h_pos)), dtype=np.int8)
+    for person, task, hour in data_schema.sparse_mandatory(data.get('F', {})):
+        if person in p_pos and task in t_pos and hour in h_pos:
+            F_arr[p_pos[person], t_pos[task], h_pos[hour]] = 1
+    return F_arr
+
+
+class PlanStore:
+    """
+    Base de datos SQLite del historial (una fila por ejecución en la tabla runs).
+    - record(data, solution, ...): guarda una ejecución y devuelve su id.
+    - list_runs(...): resúmenes (sin blobs) filtrados por sede, fechas o hash de entradas.
+    - load(run_id): (datos de entrada, StaffingSolution) tal como se resolvieron.
+    - diff(a, b): celdas (persona, hora) cuya tarea cambia entre dos planes y KPIs de ambos.
+    La conexión se comparte entre hilos (la UI guarda desde el hilo de optimización) con un lock.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, check_same_thread=False)
+        self._con.row_factory = sqlite3.Row
+        with self._lock, self._con:
+            self._con.executescript(_SCHEMA)
+            self._con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+    def record(self, data, solution, input_hash=None, seconds=None, created_at=None):
+        """
+        Guarda una ejecución. data: entradas en el formato de DATA_FILE (horas como texto, F dispersa);
+        solution: StaffingSolution. La fecha del plan es la fecha de inicio del calendario o, si no
+        tiene, la de la ejecución; la sede es data['venue'].
+        """
+        created = created_at or datetime.datetime.now()
+        calendar = data.get('calendar') or {}
+        row = {
+            'created_at': created.isoformat(timespec='seconds'),
+            'plan_date': calendar.get('start_date') or created.date().isoformat(),
+            'venue': data.get('venue') or '',
+            'input_hash': input_hash,
+            'solver': data.get('solver'),
+            'profile': data.get('profile'),
+            'status': solution.status,
+            'proven': int(bool(solution.proven)),
+            'stopped': int(bool(solution.stopped)),
+            'seconds': seconds,
+            'num_people': len(solution.people),
+            'num_tasks': len(solution.tasks),
+            'num_hours': len(solution.hours),
+            'inputs': _pack_inputs(data),
+            'plan': None,
+        }
+        if solution.is_feasible:
+            terms = objective_terms(
+                solution.assignment, _mandatory_array(data),
+                float(data['alpha']), float(data['beta']), float(data['gamma']), float(data['epsilon']),
+                solution.segments
+            )
+            m = solution.metrics
+            row.update(terms)
+            row.update({
+                'total_monotony': m.total_monotony, 'total_breaks': m.total_breaks,
+                'max_load': int(solution.load.max()) if solution.load.size else 0,
+                'plan': _pack_plan(solution),
+            })
+        columns = [c for c in row if c in SUMMARY_COLUMNS or c in ('inputs', 'plan')]
+        sql = f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with self._lock, self._con:
+            return self._con.execute(sql, [row[c] for c in columns]).lastrowid
+
+    def list_runs(self, venue=None, date_from=None, date_to=None, input_hash=None, limit=200):
+        # Resúmenes de ejecuciones (dicts con SUMMARY_COLUMNS), de la más reciente a la más antigua.
+        where, params = [], []
+        if venue is not None:
+            where.append("venue = ?"); params.append(venue)
+        if date_from is not None:
+            where.append("plan_date >= ?"); params.append(str(date_from))
+        if date_to is not None:
+            where.append("plan_date <= ?"); params.append(str(date_to))
+        if input_hash is not None:
+            where.append("input_hash = ?"); params.append(input_hash)
+        sql = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY plan_date DESC, created_at DESC, id DESC LIMIT ?"
+        params.append(int(limit))
+        with self._lock:
+            return [dict(r) for r in self._con.execute(sql, params)]
+
+    def load(self, run_id):
+        # Devuelve (datos de entrada, StaffingSolution) de la ejecución run_id. KeyError si no existe.
+        with self._lock:
+            row = self._con.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)}, inputs, plan FROM runs WHERE id = ?", (int(run_id),)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Run {run_id} not found in {self.path}")
+        data = _unpack_inputs(row['inputs'])
+        P, T, H = row['num_people'], row['num_tasks'], row['num_hours']
+        assignment = np.zeros((P, T, H), dtype=np.int8)
+        if row['plan'] is not None:
+            assigned = _unpack_plan(row['plan'], P, H)
+            p_idx, h_idx = np.nonzero(assigned >= 0)
+            assignment[p_idx, assigned[p_idx, h_idx], h_idx] = 1
+        solution = StaffingSolution(
+            row['status'], data['people'], data['tasks'], data['hours'], assignment,
+            stopped=bool(row['stopped']), proven=bool(row['proven'])
+        )
+        solution.segments = Calendar.from_json(data).segments(data['hours'])
+        return data, solution
+
+    def diff(self, run_a, run_b):
+        """
+        Compara dos ejecuciones por nombre de persona y franja (las que existen en ambas).
+        Devuelve {'changes': [(persona, franja, tarea_a, tarea_b)], 'only_a': [...personas],
+        'only_b': [...personas], 'kpis': {kpi: (valor_a, valor_b)}}; '' = la persona está libre.
+        """
+        _, sol_a = self.load(run_a)
+        _, sol_b = self.load(run_b)
+        h_pos_b = {h: i for i, h in enumerate(sol_b.hours)}
+        hours = [(i, h_pos_b[h], h) for i, h in enumerate(sol_a.hours) if h in h_pos_b]
+        p_pos_b = {p: i for i, p in enumerate(sol_b.people)}
+        changes = []
+        for pa, person in enumerate(sol_a.people):
+            pb = p_pos_b.get(person)
+            if pb is None:
+                continue
+            for ha, hb, hour in hours:
+                task_a, task_b = sol_a.task_name(pa, ha), sol_b.task_name(pb, hb)
+                if task_a != task_b:
+                    changes.append((person, hour, task_a, task_b))
+        with self._lock:
+            rows = {
+                r['id']: r for r in self._con.execute(
+                    f"SELECT id, {', '.join(KPI_COLUMNS)} FROM runs WHERE id IN (?, ?)", (int(run_a), int(run_b))
+                )
+            }
+        people_a = set(sol_a.people)
+        return {
+            'changes': changes,
+            'only_a': [p for p in sol_a.people if p not in p_pos_b],
+            'only_b': [p for p in sol_b.people if p not in people_a],
+            'kpis': {k: (rows[int(run_a)][k], rows[int(run_b)][k]) for k in KPI_COLUMNS},
+        }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Browse and compare the stored staffing plans.")
+    parser.add_argument('--db', default=DEFAULT_DB, help="History database")
+    commands = parser.add_subparsers(dest='command', required=True)
+    cmd_list = commands.add_parser('list', help="List stored runs")
+    cmd_list.add_argument('--venue', default=None)
+    cmd_list.add_argument('--from', dest='date_from', default=None, help="First plan date (YYYY-MM-DD)")
+    cmd_list.add_argument('--to', dest='date_to', default=None, help="Last plan date (YYYY-MM-DD)")
+    cmd_list.add_argument('--limit', type=int, default=50)
+    cmd_diff = commands.add_parser('diff', help="Compare two runs")
+    cmd_diff.add_argument('run_a', type=int)
+    cmd_diff.add_argument('run_b', type=int)
+    args = parser.parse_args(argv)
+
+    store = PlanStore(args.db)
+    if args.command == 'list':
+        for r in store.list_runs(args.venue, args.date_from, args.date_to, limit=args.limit):
+            objective = f"{r['objective']:.2f}" if r['objective'] is not None else "-"
+            print(f"{r['id']:>5}  {r['plan_date']}  {r['venue'] or '-':<15}  {r['status']:<10}  "
+                  f"obj {objective:>8}  {r['num_people']}x{r['num_tasks']}x{r['num_hours']}  {r['created_at']}")
+    else:
+        result = store.diff(args.run_a, args.run_b)
+        for kpi, (a, b) in result['kpis'].items():
+            print(f"{kpi:<16} {a!s:>10} -> {b!s:<10}")
+        for person, hour, task_a, task_b in result['changes']:
+            print(f"{person} @ {hour}: {task_a or '(free)'} -> {task_b or '(free)'}")
+        print(f"{len(result['changes'])} cambios, {len(result['only_a'])} personas solo en {args.run_a}, "
+              f"{len(result['only_b'])} solo en {args.run_b}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,110 @@
+# Modo de horizonte rodante para horizontes largos (varios días): en lugar de un único modelo
+# P x T x H, se resuelven ventanas solapadas de N horas. De cada ventana se confirman las primeras
+# horas y el estado de frontera (última tarea de cada persona, si trabajaba y su carga acumulada)
+# pasa a la siguiente, así que memoria y tiempo crecen de forma lineal con el número de horas.
+import math
+import time
+import numpy as np
+import model_builder
+import warm_start
+from solve_control import SolveControl
+from metrics import objective_terms
+
+
+def _apply_boundary(m, prev_task, prev_works, prior_load, beta, gamma):
+    """
+    Enlaza la ventana con lo ya confirmado, modificando el modelo antes de pasarlo a HiGHS:
+    - Monotonía (Y): repetir en la primera hora la tarea de la hora anterior cuesta beta.
+    - Inicio de bloque (S): empezar a trabajar en la primera hora sin haber trabajado en la anterior cuesta gamma.
+    - Carga (W): W[i] = carga ya confirmada + horas de la ventana, así W_max/W_min miden la carga acumulada.
+    Como cada persona hace como mucho una tarea por hora, ambos costes son lineales sobre X exactos.
+    """
+    first = m.x_col[:, :, 0] # (P, T) columnas de la primera hora de la ventana
+    P, T = first.shape
+    extra = np.zeros((P, T))
+    working = prev_task >= 0
+    extra[np.nonzero(working)[0], prev_task[working]] += beta
+    extra[~prev_works, :] += gamma
+    sel = (first >= 0) & (extra != 0)
+    m.col_cost[first[sel]] += extra[sel]
+
+    m.row_lower[m.w_rows] = prior_load
+    m.row_upper[m.w_rows] = prior_load
+
+
+def solve_rolling(data, window, overlap, control=None, start_plan=None, options=None, continuous_aux=False):
+    """
+    Resuelve el horizonte data['hours'] por ventanas de `window` horas que se solapan `overlap` horas
+    (se confirman window - overlap horas por ventana; la última se confirma entera).
+    El límite de tiempo se reparte entre ventanas en proporción a las horas confirmadas.
+    Devuelve (assignment int8 [personas, tareas, horas] o None si falta alguna ventana, detenido).
+    """
+    people, tasks, hours = data['people'], data['tasks'], data['hours']
+    P, T, H = len(people), len(tasks), len(hours)
+    window = max(1, min(int(window), H))
+    step = max(1, window - max(0, int(overlap)))
+    beta = float(data['beta'])
+    gamma = float(data['gamma'])
+    timelimit = float(data['timelimit'])
+    segments = data.get('segments')
+
+    # Control por ventana: el Stop global detiene la ventana en curso (sin el progreso por ventana de HiGHS)
+    window_control = SolveControl()
+    if control is not None:
+        control.on_cancel(window_control.cancel)
+
+    assignment = np.zeros((P, T, H), dtype=np.int8)
+    prev_task = np.full(P, -1, dtype=np.int64)
+    prev_works = np.ones(P, dtype=bool) # Antes de la primera hora no se cuenta inicio de bloque (como S)
+    prior_load = np.zeros(P, dtype=np.int64)
+    F_arr = model_builder.data_to_arrays(data)[3] if control is not None and control.progress is not None else None
+    started = time.monotonic()
+    start = 0
+    try:
+        while start < H:
+            end = min(H, start + window)
+            commit = end - start if end == H else min(step, end - start)
+            sub_data = dict(data, hours=hours[start:end])
+            if segments:
+                sub_data['segments'] = segments[start:end]
+                if start > 0 and segments[start] != segments[start - 1]:
+                    # La ventana empieza un turno nuevo: sin monotonía ni inicio de bloque con el anterior
+                    prev_task = np.full(P, -1, dtype=np.int64)
+                    prev_works = np.ones(P, dtype=bool)
+            sm = model_builder.build_model(sub_data, continuous_aux=continuous_aux)
+            _apply_boundary(sm, prev_task, prev_works, prior_load, beta, gamma)
+
+            sub_start = None
+            if start_plan is not None:
+                repaired, complete = warm_start.repair_assignment(start_plan[:, :, start:end], sm.D, sm.Q, sm.R)
+                sub_start = sm.start_vector(repaired, complete=False)
+
+            window_time = max(1.0, timelimit * commit / H)
+            print(f"Horizonte rodante: horas {start}-{end - 1} (se confirman {commit}), {sm.num_col} columnas, {window_time:.0f}s")
+            status_h, has_sol, sub_assignment = model_builder.solve_highs(sm, window_time, window_control, sub_start, options=options)
+            if not has_sol:
+                print(f"Horizonte rodante: la ventana {start}-{end - 1} terminó sin solución ({status_h})")
+                return None, window_control.cancelled
+
+            assignment[:, :, start:start + commit] = sub_assignment[:, :, :commit]
+            last = assignment[:, :, start + commit - 1]
+            prev_works = last.any(axis=1)
+            prev_task = np.where(prev_works, last.argmax(axis=1), -1)
+            prior_load += sub_assignment[:, :, :commit].sum(axis=(1, 2))
+
+            if F_arr is not None:
+                # Progreso: objetivo del plan confirmado hasta ahora
+                objective = objective_terms(
+                    assignment[:, :, :start + commit], F_arr[:, :, :start + commit],
+                    float(data['alpha']), beta, gamma, float(data['epsilon']),
+                    segments[:start + commit] if segments else None
+                )['objective']
+                control.progress.publish(objective, -math.inf, math.inf, time.monotonic() - started)
+            if window_control.cancelled and start + commit < H:
+                print("Horizonte rodante: detenido por el usuario antes de completar el horizonte")
+                return None, True
+            start += commit
+    finally:
+        if control is not None:
+            control.remove(window_control.cancel)
+    return assignment, window_control.cancelled
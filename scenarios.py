@@ -0,0 +1,186 @@
+# Resolución por lotes de escenarios: variantes de pesos (alpha, beta, gamma, epsilon, ...) y de la
+# matriz de requerimientos R sobre un staffing_data.json base, en paralelo con un pool de procesos.
+# Cada proceso recibe una parte de los núcleos (hilos de HiGHS/CBC) y el resultado es una tabla
+# comparativa con los términos del objetivo y los KPIs de cada plan.
+#
+# Uso desde la línea de comandos:
+#   python scenarios.py staffing_data.json --grid alpha=1,2,5 --grid beta=0.1,1 --r-scale 0.9,1,1.1
+# Comparar formulaciones (variables auxiliares enteras o continuas) con un perfil que demuestre el óptimo:
+#   python scenarios.py staffing_data.json --grid continuous_aux=0,1 --grid profile="prove optimal" --workers 1
+import argparse
+import copy
+import csv
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import main # solve_model (el import no arranca la UI)
+import data_schema
+import model_builder
+from calendar_slots import Calendar
+from metrics import objective_terms
+
+# Columnas de la tabla comparativa
+TABLE_COLUMNS = [
+    'scenario', 'status', 'proven', 'objective', 'load_gap', 'monotony', 'block_starts', 'unmet_mandatory',
+    'total_monotony', 'total_breaks', 'max_load', 'seconds'
+]
+
+
+def solver_data_from_json(data):
+    # Convierte los datos tal como se leen del JSON (horas como texto, ver data_schema.from_disk) al formato del solver (horas int)
+    # y añade el turno de cada franja activa según el calendario guardado.
+    solver_data = dict(data)
+    solver_data['D'] = {k: {int(h): v for h, v in d.items()} for k, d in data['D'].items()}
+    solver_data['R'] = {k: {int(h): v for h, v in d.items()} for k, d in data['R'].items()}
+    solver_data['F'] = {
+        i: {t: {int(h): v for h, v in hv.items()} for t, hv in tv.items()} for i, tv in data['F'].items()
+    }
+    solver_data['segments'] = Calendar.from_json(data).segments(data['hours'])
+    return solver_data
+
+
+def make_scenarios(grid=None, r_scales=None):
+    """
+    Producto cartesiano de sustituciones de parámetros y escalados de R.
+    grid: dict parámetro -> lista de valores, p. ej. {'alpha': [1, 2], 'beta': [0.1, 1]}.
+    r_scales: lista de factores que multiplican R (redondeando), p. ej. [0.9, 1.0, 1.1].
+    Devuelve una lista de dicts {'name', 'overrides', 'r_scale'}.
+    """
+    grid = grid or {}
+    names = list(grid)
+    scenarios = []
+    for values in itertools.product(*(grid[n] for n in names)):
+        for r_scale in (r_scales or [1.0]):
+            overrides = dict(zip(names, values))
+            parts = [f"{k}={v}" for k, v in overrides.items()]
+            if r_scale != 1.0:
+                parts.append(f"R*{r_scale}")
+            scenarios.append({'name': " ".join(parts) or "base", 'overrides': overrides, 'r_scale': r_scale})
+    return scenarios
+
+
+def apply_scenario(base, scenario):
+    # Devuelve una copia de los datos del solver con las sustituciones y el escalado de R del escenario.
+    data = copy.deepcopy(base)
+    data.update(scenario.get('overrides', {}))
+    r_scale = scenario.get('r_scale', 1.0)
+    if r_scale != 1.0:
+        data['R'] = {t: {h: int(round(v * r_scale)) for h, v in hv.items()} for t, hv in data['R'].items()}
+    for t, hv in scenario.get('R', {}).items():
+        for h, v in hv.items():
+            data['R'][t][int(h)] = int(v)
+    return data
+
+
+def solve_scenario(base, scenario, threads=None):
+    # Resuelve un escenario (se ejecuta dentro de un proceso del pool) y devuelve su fila de la tabla.
+    data = apply_scenario(base, scenario)
+    if threads:
+        data['threads'] = threads
+    start = time.monotonic()
+    solution = main.solve_model(data)
+    row = {
+        'scenario': scenario.get('name', ''), 'status': solution.status, 'proven': solution.proven,
+        'seconds': round(time.monotonic() - start, 2)
+    }
+    if solution.is_feasible:
+        F_arr = model_builder.data_to_arrays(data)[3]
+        terms = objective_terms(
+            solution.assignment, F_arr,
+            float(data['alpha']), float(data['beta']), float(data['gamma']), float(data['epsilon']),
+            data.get('segments')
+        )
+        m = solution.metrics
+        row.update({k: round(v, 4) for k, v in terms.items()})
+        row.update({
+            'total_monotony': m.total_monotony, 'total_breaks': m.total_breaks,
+            'max_load': int(solution.load.max()) if solution.load.size else 0,
+        })
+    return row
+
+
+def run_batch(base, scenarios, workers=None, threads_per_worker=None):
+    """
+    Resuelve todos los escenarios en paralelo con un ProcessPoolExecutor.
+    Por defecto hay un proceso por núcleo (sin pasar del número de escenarios) y los núcleos
+    se reparten a partes iguales entre procesos como hilos del solver.
+    Devuelve las filas de resultados en el mismo orden que scenarios.
+    """
+    cpus = os.cpu_count() or 1
+    workers = workers or max(1, min(len(scenarios), cpus))
+    threads_per_worker = threads_per_worker or max(1, cpus // workers)
+    print(f"Resolviendo {len(scenarios)} escenarios con {workers} procesos x {threads_per_worker} hilos")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(solve_scenario, base, s, threads_per_worker) for s in scenarios]
+        return [f.result() for f in futures]
+
+
+def format_table(rows):
+    # Tabla de texto alineada con una fila por escenario.
+    def fmt(v):
+        if v is None: return "-"
+        if isinstance(v, float): return f"{v:.2f}" if math.isfinite(v) else "-"
+        return str(v)
+    cells = [[fmt(r.get(c)) for c in TABLE_COLUMNS] for r in rows]
+    widths = [max([len(c)] + [len(row[k]) for row in cells]) for k, c in enumerate(TABLE_COLUMNS)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(TABLE_COLUMNS, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+
+def _parse_grid(items):
+    # ['alpha=1,2', 'solver=cbc,highs'] -> {'alpha': [1.0, 2.0], 'solver': ['cbc', 'highs']}
+    grid = {}
+    for item in items or []:
+        name, _, values = item.partition('=')
+        parsed = []
+        for v in values.split(','):
+            try: parsed.append(float(v))
+            except ValueError: parsed.append(v)
+        grid[name.strip()] = parsed
+    return grid
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a grid of staffing scenarios in parallel and compare them.")
+    parser.add_argument('data', nargs='?', default=main.DATA_FILE, help="Base staffing_data.json")
+    parser.add_argument('--grid', action='append', metavar='PARAM=V1,V2', help="Parameter values to sweep (repeatable)")
+    parser.add_argument('--r-scale', default=None, help="Comma-separated factors applied to the R matrix")
+    parser.add_argument('--scenarios', default=None, help="JSON file with a list of {name, overrides, r_scale, R}")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--threads', type=int, default=None, help="Solver threads per worker")
+    parser.add_argument('--timelimit', type=int, default=None, help="Time limit per scenario (s)")
+    parser.add_argument('--solver', choices=['highs', 'cbc', 'heuristic'], default=None)
+    parser.add_argument('--csv', default=None, help="Also write the table to this CSV file")
+    args = parser.parse_args(argv)
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        base = solver_data_from_json(data_schema.from_disk(json.load(f)))
+    if args.timelimit is not None: base['timelimit'] = args.timelimit
+    if args.solver is not None: base['solver'] = args.solver
+
+    if args.scenarios:
+        with open(args.scenarios, 'r', encoding='utf-8') as f:
+            scenarios = json.load(f)
+    else:
+        r_scales = [float(v) for v in args.r_scale.split(',')] if args.r_scale else None
+        scenarios = make_scenarios(_parse_grid(args.grid), r_scales)
+
+    start = time.monotonic()
+    rows = run_batch(base, scenarios, args.workers, args.threads)
+    print(format_table(rows))
+    print(f"{len(rows)} escenarios en {time.monotonic() - start:.1f}s")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main_cli()
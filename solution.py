@@ -0,0 +1,61 @@
+# Objeto solución compacto que devuelve solve_model y que consumen la UI y los exportadores.
+# Todo se lee con indexado de arrays NumPy en lugar de llamar a value() de PuLP celda a celda.
+import numpy as np
+from metrics import compute_metrics
+
+
+class StaffingSolution:
+    """
+    Resultado de una optimización.
+    - status: texto del estado ('Optimal', 'Feasible' (heurística u horizonte rodante), 'Infeasible', 'Not Solved', 'Undefined').
+    - assignment: int8 [personas, tareas, horas], 1 si la persona hace la tarea en esa hora.
+    - assigned_task: int16 [personas, horas], índice de la tarea asignada o -1 si está libre.
+    - load: int32 [personas], horas trabajadas por cada persona.
+    - stopped: True si el usuario detuvo la optimización (la solución es el mejor incumbente).
+    - proven: True si el solver demostró la optimalidad (no solo el mejor incumbente al límite de tiempo).
+    - feasibility: FeasibilityReport de la comprobación previa (celdas imposibles y F en conflicto), o None.
+    - cached: True si el plan viene de la caché de soluciones (mismas entradas ya resueltas).
+    - segments: turno/día de cada hora (calendario de varios días) para las métricas, o None.
+    Los ejes siguen el orden de people, tasks y hours.
+    """
+    def __init__(self, status, people, tasks, hours, assignment=None, stopped=False, feasibility=None, proven=False):
+        self.status = status
+        self.stopped = stopped
+        self.proven = proven
+        self.feasibility = feasibility
+        self.cached = False
+        self.segments = None
+        self.people = list(people)
+        self.tasks = list(tasks)
+        self.hours = list(hours)
+
+        P, T, H = len(self.people), len(self.tasks), len(self.hours)
+        if assignment is None:
+            assignment = np.zeros((P, T, H), dtype=np.int8)
+        self.assignment = np.asarray(assignment, dtype=np.int8).reshape(P, T, H)
+
+        # Tarea asignada por (persona, hora): argmax sobre tareas, -1 donde no trabaja
+        works = self.assignment.any(axis=1)
+        self.assigned_task = np.where(works, self.assignment.argmax(axis=1), -1).astype(np.int16)
+        self.load = self.assignment.sum(axis=(1, 2), dtype=np.int32)
+        self._metrics = None
+
+    @property
+    def is_feasible(self):
+        return self.status in ("Optimal", "Feasible")
+
+    @property
+    def load_gap(self):
+        return int(self.load.max() - self.load.min()) if self.load.size else 0
+
+    @property
+    def metrics(self):
+        # KPIs del plan (PlanMetrics), calculados una sola vez y compartidos por la UI y los exportadores
+        if self._metrics is None:
+            self._metrics = compute_metrics(self.assignment, self.segments)
+        return self._metrics
+
+    def task_name(self, p_idx, h_idx):
+        # Nombre de la tarea asignada ('' si la persona no trabaja en esa hora).
+        t_idx = self.assigned_task[p_idx, h_idx]
+        return self.tasks[t_idx] if t_idx >= 0 else ""
@@ -0,0 +1,105 @@
+# Caché en disco de soluciones, direccionada por contenido: la clave es un hash canónico de las
+# entradas del solver (personas, tareas, horas, D, Q, R, F, pesos, solver, límite de tiempo, perfil y calendario).
+# Volver a calcular con los mismos datos (o deshacer un cambio) devuelve al instante el plan guardado si
+# estaba demostrado óptimo; si no (límite de tiempo, heurística), solo sirve de arranque en caliente.
+import hashlib
+import json
+import os
+import numpy as np
+from solution import StaffingSolution
+
+# Claves de final_data que determinan el resultado del solver
+HASH_KEYS = (
+    'people', 'tasks', 'hours', 'D', 'Q', 'R', 'F', 'alpha', 'beta', 'gamma', 'epsilon', 'solver', 'timelimit',
+    'profile', 'profiles', 'rolling_window', 'calendar', 'mandatory_mode'
+)
+
+
+def _canonical(value):
+    # Normaliza claves a texto y números a float para que {0: 1} y {"0": 1.0} den el mismo hash.
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def input_hash(data):
+    # Hash SHA-256 de la serialización canónica (claves ordenadas, sin espacios) de las entradas.
+    payload = {k: _canonical(data.get(k)) for k in HASH_KEYS}
+    text = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class SolutionCache:
+    """
+    Caché LRU de soluciones en una carpeta, un archivo <hash>.json por entrada.
+    La antigüedad de cada entrada es la fecha de modificación del archivo: get() la renueva
+    y put() expulsa las menos usadas recientemente cuando se supera max_entries.
+    Solo se guardan planes factibles que no se detuvieron a mano. Los no demostrados (proven=False)
+    se guardan igualmente, pero quien llama no debe darlos por resultado final (ver is_final).
+    """
+    def __init__(self, directory, max_entries=50):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key, people, tasks, hours):
+        # Devuelve el StaffingSolution guardado para key, o None si no está (o no se puede leer).
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            assignment = np.zeros((len(people), len(tasks), len(hours)), dtype=np.int8)
+            if entry['assignments']:
+                p_idx, t_idx, h_idx = np.array(entry['assignments'], dtype=np.int64).T
+                assignment[p_idx, t_idx, h_idx] = 1
+            os.utime(path) # Uso reciente (LRU)
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"Entrada de caché inválida ({path}): {e}")
+            return None
+        solution = StaffingSolution(entry['status'], people, tasks, hours, assignment, proven=bool(entry.get('proven', False)))
+        solution.cached = True
+        return solution
+
+    @staticmethod
+    def is_final(solution):
+        # True si el plan de la caché se puede devolver sin resolver (óptimo demostrado).
+        return solution is not None and solution.proven
+
+    def put(self, key, solution):
+        if not solution.is_feasible or solution.stopped:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            'status': solution.status,
+            'proven': bool(solution.proven),
+            'assignments': np.argwhere(solution.assignment).tolist(),
+        }
+        try:
+            with open(self._path(key), 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            self._evict()
+        except OSError as e:
+            print(f"No se pudo guardar en la caché de soluciones: {e}")
+
+    def _evict(self):
+        # Borra las entradas menos usadas recientemente por encima de max_entries.
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory) if name.endswith('.json')
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try: os.remove(path)
+            except OSError: pass
@@ -0,0 +1,147 @@
+# Cancelación cooperativa de la optimización en curso (botón Stop de la UI).
+# Cada motor registra cómo detenerse: HiGHS con su interrupción por callback y CBC
+# deteniendo el subproceso que lanza PuLP. En ambos casos se conserva la mejor solución encontrada.
+# También incluye el canal de progreso (incumbente, cota, gap) que HiGHS publica hacia la barra de estado.
+import math
+import os
+import signal
+import subprocess
+import threading
+import time
+from pulp import PULP_CBC_CMD
+from pulp.apis import coin_api
+
+
+class ProgressChannel:
+    """
+    Canal de progreso entre el hilo del solver y la UI, con throttling.
+    publish() solo guarda el último estado (coste casi nulo para el solver); el listener
+    recibe como mucho una actualización cada min_interval segundos y siempre la más reciente.
+    El listener recibe (latest, history): latest = dict(objective, bound, gap, elapsed) y
+    history = lista de (elapsed, objective, bound) para dibujar la curva de convergencia.
+    """
+    def __init__(self, listener, min_interval=0.5):
+        self.listener = listener
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._latest = None
+        self._history = []
+        self._last_emit = 0.0
+        self._timer = None
+        self._closed = False
+
+    def publish(self, objective, bound, gap, elapsed):
+        with self._lock:
+            if self._closed:
+                return
+            self._latest = {'objective': objective, 'bound': bound, 'gap': gap, 'elapsed': elapsed}
+            if math.isfinite(objective) or math.isfinite(bound):
+                self._history.append((elapsed, objective, bound))
+            wait = self.min_interval - (time.monotonic() - self._last_emit)
+            if wait > 0:
+                # Demasiado pronto: se programa un único envío diferido con el último estado
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self._emit)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self._emit()
+
+    def _emit(self):
+        with self._lock:
+            self._timer = None
+            if self._closed or self._latest is None:
+                return
+            self._last_emit = time.monotonic()
+            latest, history = dict(self._latest), list(self._history)
+        try: self.listener(latest, history)
+        except Exception as e: print(f"Error al publicar el progreso: {e}")
+
+    def close(self):
+        # Se llama al terminar la optimización: descarta envíos pendientes.
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+class SolveControl:
+    """
+    Token compartido entre la UI y el solver. La UI llama a cancel(); el solver registra
+    con on_cancel() la acción que lo detiene (si ya se canceló, se ejecuta al instante).
+    Opcionalmente lleva un ProgressChannel por el que el solver publica incumbente, cota y gap.
+    """
+    def __init__(self, progress=None):
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._handlers = []
+        self.progress = progress
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            handlers = list(self._handlers)
+        for fn in handlers:
+            try: fn()
+            except Exception as e: print(f"Error al detener el solver: {e}")
+
+    def on_cancel(self, fn):
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._handlers.append(fn)
+                return
+        fn()
+
+    def remove(self, fn):
+        with self._lock:
+            if fn in self._handlers:
+                self._handlers.remove(fn)
+
+
+def stop_process(proc):
+    # Detiene un subproceso de CBC. En POSIX se envía SIGINT: CBC para y escribe su mejor solución.
+    # En Windows no hay Ctrl-C para procesos hijos, así que se termina (sin incumbente).
+    if proc.poll() is not None:
+        return
+    if os.name == 'posix':
+        proc.send_signal(signal.SIGINT)
+    else:
+        proc.terminate()
+
+
+class _PopenHook:
+    # Sustituto del módulo subprocess dentro de pulp.apis.coin_api que registra el proceso de CBC.
+    def __init__(self, control):
+        self.control = control
+
+    def __getattr__(self, name):
+        return getattr(subprocess, name)
+
+    def Popen(self, *args, **kwargs):
+        proc = subprocess.Popen(*args, **kwargs)
+        self.control.on_cancel(lambda: stop_process(proc))
+        return proc
+
+
+class CancellableCBC(PULP_CBC_CMD):
+    """PULP_CBC_CMD cuyo subproceso se puede detener desde un SolveControl."""
+    _hook_lock = threading.Lock()
+
+    def __init__(self, control=None, **kwargs):
+        super().__init__(**kwargs)
+        self.control = control
+
+    def solve_CBC(self, lp, use_mps=True):
+        if self.control is None:
+            return super().solve_CBC(lp, use_mps)
+        with CancellableCBC._hook_lock:
+            coin_api.subprocess = _PopenHook(self.control)
+            try:
+                return super().solve_CBC(lp, use_mps)
+            finally:
+                coin_api.subprocess = subprocess
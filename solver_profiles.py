@@ -0,0 +1,85 @@
+# Perfiles de solver con nombre ("fast", "balanced", "prove optimal"): hilos, gap relativo de parada,
+# esfuerzo de heurísticas, semilla y límite de nodos. Se guardan en staffing_data.json ('profiles' y
+# 'profile') para que se puedan ajustar sin tocar código, y se traducen a opciones de HiGHS y de CBC.
+# Cada perfil elige además la formulación: variables auxiliares enteras o continuas (continuous_aux).
+import highspy
+
+# Valores por defecto de cada perfil. threads=0 -> automático; mip_max_nodes=None -> sin límite.
+# continuous_aux: W, Y, S y U continuas (solo se ramifica sobre X; ver model_builder.build_model).
+# 'balanced' reproduce los valores por defecto de HiGHS (gap 0.01 %, esfuerzo 0.05).
+CONTINUOUS_AUX = False
+DEFAULT_PROFILES = {
+    'fast': {
+        'threads': 0, 'mip_rel_gap': 0.01, 'mip_heuristic_effort': 0.3, 'random_seed': 0, 'mip_max_nodes': 2000,
+        'continuous_aux': CONTINUOUS_AUX,
+    },
+    'balanced': {
+        'threads': 0, 'mip_rel_gap': 1e-4, 'mip_heuristic_effort': 0.05, 'random_seed': 0, 'mip_max_nodes': None,
+        'continuous_aux': CONTINUOUS_AUX,
+    },
+    'prove optimal': {
+        'threads': 0, 'mip_rel_gap': 0.0, 'mip_heuristic_effort': 0.05, 'random_seed': 0, 'mip_max_nodes': None,
+        'continuous_aux': CONTINUOUS_AUX,
+    },
+}
+DEFAULT_PROFILE = 'balanced'
+
+
+def load_profiles(data):
+    # Perfiles por defecto completados/sobrescritos con los del JSON (data['profiles']), si los hay.
+    profiles = {name: dict(settings) for name, settings in DEFAULT_PROFILES.items()}
+    for name, settings in ((data or {}).get('profiles') or {}).items():
+        profiles.setdefault(name, dict(DEFAULT_PROFILES[DEFAULT_PROFILE])).update(settings)
+    return profiles
+
+
+def resolve_profile(data):
+    """
+    Ajustes efectivos para una optimización: el perfil data['profile'] (por defecto 'balanced').
+    Si data trae 'threads' (reparto de núcleos del modo por lotes o de la carrera) o 'continuous_aux'
+    (p. ej. en una rejilla de scenarios.py para comparar formulaciones), prevalece.
+    """
+    profiles = load_profiles(data)
+    name = data.get('profile', DEFAULT_PROFILE)
+    settings = dict(profiles.get(name, profiles[DEFAULT_PROFILE]))
+    if data.get('threads'):
+        settings['threads'] = int(data['threads'])
+    if data.get('continuous_aux') is not None:
+        settings['continuous_aux'] = bool(data['continuous_aux'])
+    return settings
+
+
+def highs_options(settings):
+    # Opciones de highspy.Highs.setOptionValue para unos ajustes de perfil. Se emiten siempre todas
+    # (sin límite de nodos = kHighsIInf): la instancia de la sesión se reutiliza entre perfiles.
+    nodes = settings.get('mip_max_nodes')
+    return {
+        'threads': int(settings.get('threads') or 0),
+        'mip_rel_gap': float(settings.get('mip_rel_gap', 1e-4)),
+        'mip_heuristic_effort': float(settings.get('mip_heuristic_effort', 0.05)),
+        'random_seed': int(settings.get('random_seed') or 0),
+        'mip_max_nodes': int(nodes) if nodes is not None else highspy.kHighsIInf,
+    }
+
+
+def cbc_options(settings):
+    # Argumentos equivalentes de PULP_CBC_CMD (hilos, gapRel, maxNodes y semilla de CBC).
+    options = {
+        'threads': int(settings['threads']) if settings.get('threads') else None,
+        'gapRel': float(settings.get('mip_rel_gap', 1e-4)),
+        'options': [f"randomCbcSeed {int(settings.get('random_seed') or 0)}"],
+    }
+    if settings.get('mip_max_nodes') is not None:
+        options['maxNodes'] = int(settings['mip_max_nodes'])
+    return options
+
+
+def describe(settings):
+    # Resumen corto (en inglés, para la UI) de un perfil.
+    threads = int(settings.get('threads') or 0)
+    nodes = settings.get('mip_max_nodes')
+    return (
+        f"gap {float(settings.get('mip_rel_gap', 0)):.2%} · heuristics {float(settings.get('mip_heuristic_effort', 0)):g}"
+        f" · threads {threads or 'auto'} · nodes {nodes if nodes is not None else 'no limit'}"
+        + (" · continuous aux" if settings.get('continuous_aux') else "")
+    )
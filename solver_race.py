@@ -0,0 +1,136 @@
+# Modo "Race": CBC y HiGHS resuelven la misma instancia a la vez, cada uno en su propio proceso
+# y con el mismo límite de tiempo. El primero que demuestra optimalidad gana y los demás se detienen;
+# si nadie lo demuestra, se devuelve el mejor incumbente al llegar al límite. La heurística
+# (instantánea) corre antes en el proceso principal: da la solución inicial de ambos y el plan de respaldo.
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from solve_control import SolveControl, ProgressChannel
+from metrics import objective_terms
+import model_builder
+
+# Motores que compiten
+RACE_ENGINES = ('highs', 'cbc')
+# Margen tras el límite de tiempo para que los motores detenidos entreguen su incumbente
+RACE_GRACE_SECONDS = 30
+
+
+def _race_worker(engine, data, start_plan, results, stop_event):
+    # Proceso de un motor: resuelve y envía ('progress', ...) y al final ('result', ...) por la cola.
+    import main # Import diferido: en el proceso hijo no hace falta cargarlo hasta aquí
+
+    progress = ProgressChannel(lambda latest, history: results.put(('progress', engine, latest)))
+    control = SolveControl(progress=progress)
+
+    # Hilo que traslada la orden de parada del proceso principal al SolveControl local
+    def watch_stop():
+        stop_event.wait()
+        control.cancel()
+    threading.Thread(target=watch_stop, daemon=True).start()
+
+    try:
+        if engine == 'cbc':
+            solution = main.solve_model_cbc(data, control, start_plan)
+        else:
+            solution = main.solve_model_highs(data, control, start_plan)
+        progress.close()
+        results.put(('result', engine, solution))
+    except Exception as e:
+        results.put(('error', engine, str(e)))
+
+
+def _objective(data, solution, F_arr):
+    return objective_terms(
+        solution.assignment, F_arr,
+        float(data['alpha']), float(data['beta']), float(data['gamma']), float(data['epsilon']),
+        data.get('segments')
+    )['objective']
+
+
+def race_solve(data, control=None, start_plan=None, engines=RACE_ENGINES):
+    """
+    Lanza un proceso por motor con los mismos datos, límite de tiempo y solución inicial.
+    - Reenvía al control.progress del llamante el mejor incumbente y la mejor cota de todos los motores.
+    - En cuanto uno demuestra optimalidad (solution.proven) se detiene al resto.
+    - Si nadie la demuestra, se espera a que todos paren (límite de tiempo o Stop) y gana el mejor objetivo.
+    Devuelve (StaffingSolution ganadora o None, nombre del motor ganador).
+    """
+    # Los núcleos se reparten entre los motores
+    threads = max(1, (os.cpu_count() or 1) // len(engines))
+    engine_data = dict(data, threads=threads)
+    F_arr = model_builder.data_to_arrays(data)[3]
+
+    ctx = multiprocessing.get_context()
+    results = ctx.Queue()
+    stop_event = ctx.Event()
+    processes = {
+        engine: ctx.Process(target=_race_worker, args=(engine, engine_data, start_plan, results, stop_event), daemon=True)
+        for engine in engines
+    }
+    for p in processes.values():
+        p.start()
+    if control is not None:
+        control.on_cancel(stop_event.set)
+
+    deadline = time.monotonic() + int(data['timelimit']) + RACE_GRACE_SECONDS
+    started = time.monotonic()
+    latest = {} # motor -> último progreso publicado
+    finished = {} # motor -> StaffingSolution
+    winner = None
+    try:
+        while len(finished) < len(engines):
+            try:
+                kind, engine, payload = results.get(timeout=max(0.1, min(1.0, deadline - time.monotonic())))
+            except queue.Empty:
+                if time.monotonic() >= deadline or not any(p.is_alive() for p in processes.values()):
+                    print("Carrera: algún motor no respondió a tiempo")
+                    break
+                continue
+
+            if kind == 'progress':
+                latest[engine] = payload
+                if control is not None and control.progress is not None:
+                    objectives = [v['objective'] for v in latest.values() if math.isfinite(v['objective'])]
+                    bounds = [v['bound'] for v in latest.values() if math.isfinite(v['bound'])]
+                    best_obj = min(objectives) if objectives else math.inf
+                    best_bound = max(bounds) if bounds else -math.inf
+                    gap = (best_obj - best_bound) / abs(best_obj) if objectives and bounds and best_obj != 0 else math.inf
+                    control.progress.publish(best_obj, best_bound, gap, time.monotonic() - started)
+                continue
+
+            if kind == 'error':
+                print(f"Carrera: error en {engine.upper()}: {payload}")
+                finished[engine] = None
+                continue
+
+            finished[engine] = payload
+            print(f"Carrera: {engine.upper()} terminó con estado {payload.status}" + (" (óptimo demostrado)" if payload.proven else ""))
+            if payload.proven and winner is None:
+                winner = engine
+                stop_event.set() # Los demás se detienen y entregan lo que tengan; se ignora
+                break
+    finally:
+        stop_event.set()
+        if control is not None:
+            control.remove(stop_event.set)
+        for p in processes.values():
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+
+    if winner is None:
+        # Nadie demostró optimalidad: el mejor incumbente entre los motores que terminaron
+        candidates = [(e, s) for e, s in finished.items() if s is not None and s.is_feasible]
+        if candidates:
+            winner = min(candidates, key=lambda es: _objective(data, es[1], F_arr))[0]
+    if winner is None:
+        # Ninguno tiene plan: se devuelve cualquier estado recibido (p. ej. Infeasible) para informar
+        for e, s in finished.items():
+            if s is not None:
+                return s, e
+        return None, None
+    print(f"Carrera: gana {winner.upper()}")
+    return finished[winner], winner
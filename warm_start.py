@@ -0,0 +1,111 @@
+# Arranque en caliente (MIP start) a partir del último plan calculado.
+# El plan se guarda por nombres (persona, tarea, hora) junto a staffing_data.json, se proyecta
+# sobre el modelo nuevo, se repara donde incumple las restricciones duras y se entrega a
+# HiGHS (setSolution) o a CBC (mipStart de PuLP) como solución inicial.
+import json
+import os
+import numpy as np
+
+
+def last_plan_path(data_file):
+    # staffing_data.json -> staffing_data_last_plan.json (misma carpeta)
+    return os.path.splitext(data_file)[0] + "_last_plan.json"
+
+
+def save_last_plan(solution, path):
+    # Guarda las asignaciones de una solución factible como lista de [persona, tarea, hora].
+    if not solution.is_feasible:
+        return
+    p_idx, t_idx, h_idx = np.nonzero(solution.assignment)
+    plan = {
+        'assignments': [
+            [solution.people[p], solution.tasks[t], solution.hours[h]]
+            for p, t, h in zip(p_idx.tolist(), t_idx.tolist(), h_idx.tolist())
+        ]
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, ensure_ascii=False)
+
+
+def load_last_plan(path, people, tasks, hours):
+    """
+    Lee el último plan y lo proyecta sobre las personas/tareas/horas actuales por nombre.
+    Devuelve un array int8 [personas, tareas, horas] o None si no hay plan guardado.
+    Las asignaciones de personas, tareas u horas que ya no existen se descartan.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo leer el plan anterior ({path}): {e}")
+        return None
+
+    p_pos = {p: i for i, p in enumerate(people)}
+    t_pos = {t: i for i, t in enumerate(tasks)}
+    h_pos = {h: i for i, h in enumerate(hours)}
+    start = np.zeros((len(people), len(tasks), len(hours)), dtype=np.int8)
+    for person, task, hour in plan.get('assignments', []):
+        if person in p_pos and task in t_pos and hour in h_pos:
+            start[p_pos[person], t_pos[task], h_pos[hour]] = 1
+    return start
+
+
+def repair_assignment(start, D_arr, Q_arr, R_arr):
+    """
+    Repara un plan inicial para que cumpla las restricciones duras del modelo actual:
+    1. Quita asignaciones de personas no disponibles (D), no cualificadas (Q) o de celdas sin demanda (R).
+    2. Deja como mucho una tarea por persona y hora.
+    3. Recorta las celdas (tarea, hora) con más gente de la requerida.
+    4. Rellena las celdas con déficit con personas libres, cualificadas y disponibles, prefiriendo
+       a quien trabaja en horas adyacentes (evita descansos) y, después, a quien menos carga lleva.
+    Devuelve (assignment, complete): complete=True si el plan cumple R exactamente.
+    """
+    A = start.astype(bool) & (Q_arr[:, :, None] == 1) & (D_arr[:, None, :] == 1) & (R_arr[None, :, :] > 0)
+    P, T, H = A.shape
+
+    # 2. Una tarea por persona y hora: se conserva la primera
+    first = np.cumsum(A, axis=1) == 1
+    A &= first
+
+    # 3. Exceso de gente en una celda: se quitan las últimas personas asignadas
+    over = np.cumsum(A, axis=0) > R_arr[None, :, :]
+    A &= ~over
+
+    # 4. Déficit: relleno voraz celda a celda
+    works = A.any(axis=1)
+    load = A.sum(axis=(1, 2))
+    deficit = R_arr - A.sum(axis=0)
+    for t, h in zip(*np.nonzero(deficit > 0)):
+        free = (Q_arr[:, t] == 1) & (D_arr[:, h] == 1) & ~works[:, h]
+        candidates = np.nonzero(free)[0]
+        if candidates.size == 0:
+            continue
+        adjacent = np.zeros(P, dtype=bool)
+        if h > 0: adjacent |= works[:, h - 1]
+        if h < H - 1: adjacent |= works[:, h + 1]
+        order = np.lexsort((load[candidates], ~adjacent[candidates]))
+        chosen = candidates[order[:deficit[t, h]]]
+        A[chosen, t, h] = True
+        works[chosen, h] = True
+        load[chosen] += 1
+        deficit[t, h] -= chosen.size
+
+    complete = bool((deficit == 0).all())
+    return A.astype(np.int8), complete
+
+
+def auxiliary_values(assignment, F_arr):
+    """
+    Valores de las variables auxiliares que corresponden a un plan X (denso):
+    load [P] (W), Y [P, T, H-1] (monotonía), S [P, H-1] (inicio de bloque de trabajo)
+    y U [P, T, H] (obligatoriedad incumplida).
+    """
+    A = np.asarray(assignment, dtype=np.int8)
+    works = A.any(axis=1).astype(np.int8)
+    load = A.sum(axis=(1, 2))
+    Y = A[:, :, :-1] & A[:, :, 1:]
+    S = np.maximum(works[:, 1:] - works[:, :-1], 0)
+    U = ((F_arr == 1) & (A == 0)).astype(np.int8)
+    return load, Y, S, U